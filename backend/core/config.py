@@ -1,5 +1,5 @@
 import os
-import json
+import orjson
 from dotenv import load_dotenv
 
 # [수정됨] backend/core/config.py 위치에서 3단계 올라가야 루트(PO-SYSTEM)입니다.
@@ -11,6 +11,9 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__fil
 # .env 파일 로드
 load_dotenv(os.path.join(BASE_DIR, ".env"))
 
+# system_config.json 파싱 결과 캐시 (파일 mtime/size 가 바뀔 때만 다시 읽음)
+_config_cache = {"key": None, "data": {}, "safety_stock": 0}
+
 class Settings:
     PROJECT_NAME: str = "POReviewSystem"
     VERSION: str = "2.0.0"
@@ -27,28 +30,54 @@ class Settings:
     DATA_DIR = os.path.join(BASE_DIR, os.getenv("DATA_DIR", "data"))
     FRONTEND_DIR = os.path.join(BASE_DIR, "frontend")
 
+    # 파싱 직후 버려지는 업로드 파일용 폴더 (tmpfs(/dev/shm)가 있으면 RAM 에 기록)
+    UPLOAD_TMP_DIR = os.getenv("UPLOAD_TMP_DIR") or (
+        os.path.join("/dev/shm", "po-system") if os.path.isdir("/dev/shm") else TEMP_DIR
+    )
+    # UPLOAD_TMP_DIR 에서 이 시간(초)보다 오래된 파일은 주기적으로 삭제
+    UPLOAD_TMP_MAX_AGE = int(os.getenv("UPLOAD_TMP_MAX_AGE", "3600"))
+
     # 폴더 자동 생성
     os.makedirs(TEMP_DIR, exist_ok=True)
     os.makedirs(OUTPUT_DIR, exist_ok=True)
+    os.makedirs(UPLOAD_TMP_DIR, exist_ok=True)
 
     def _load_system_config(self):
-        """Load system configuration (e.g., safety stock) from data directory."""
+        """
+        Load system configuration (e.g., safety stock) from data directory.
+        The parsed dict is cached and only re-read when the file's mtime/size changes.
+        """
         config_path = os.path.join(self.DATA_DIR, "system_config.json")
         try:
-            with open(config_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except FileNotFoundError:
+            st = os.stat(config_path)
+        except OSError:
+            _config_cache.update(key=None, data={}, safety_stock=0)
             return {}
+
+        key = (st.st_mtime_ns, st.st_size)
+        if _config_cache["key"] == key:
+            return _config_cache["data"]
+
+        try:
+            with open(config_path, "rb") as f:
+                data = orjson.loads(f.read())
         except Exception:
-            return {}
+            data = {}
+        if not isinstance(data, dict):
+            data = {}
+
+        try:
+            safety_stock = max(0, int(data.get("safety_stock", 0)))
+        except (TypeError, ValueError):
+            safety_stock = 0
+
+        _config_cache.update(key=key, data=data, safety_stock=safety_stock)
+        return data
 
     @property
     def SAFETY_STOCK(self) -> int:
         """Return configured safety stock with a safe default of 0."""
-        config = self._load_system_config()
-        try:
-            return max(0, int(config.get("safety_stock", 0)))
-        except (TypeError, ValueError):
-            return 0
+        self._load_system_config()
+        return _config_cache["safety_stock"]
 
 settings = Settings()
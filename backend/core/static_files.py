@@ -0,0 +1,88 @@
+import os
+import hashlib
+import mimetypes
+import logging
+from typing import Iterable
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+logger = logging.getLogger(__name__)
+
+# 이 크기 이하의 파일만 메모리에 적재 (그 이상은 StaticFiles 가 디스크에서 전송)
+MAX_CACHED_SIZE = 512 * 1024
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles that serves small files from an in-memory snapshot taken at startup.
+    Each hit re-checks the file's (mtime, size) with one stat, so edited files are reloaded.
+    Files larger than max_size (or added after startup) fall through to StaticFiles.
+    Top-level sub-directories listed in exclude (e.g. ones served by another mount) are not preloaded.
+    """
+
+    def __init__(self, *, directory: str, max_size: int = MAX_CACHED_SIZE, exclude: Iterable[str] = (), **kwargs):
+        super().__init__(directory=directory, **kwargs)
+        self._root = directory
+        self._max_size = max_size
+        self._cache = self._preload(directory, max_size, frozenset(exclude))
+        logger.info(f"Static cache: {len(self._cache)} files preloaded from {directory}")
+
+    @staticmethod
+    def _load(full_path: str, name: str, st: os.stat_result) -> tuple:
+        with open(full_path, "rb") as f:
+            content = f.read()
+        etag = f'"{hashlib.blake2b(content).hexdigest()[:16]}"'
+        media_type = mimetypes.guess_type(name)[0] or "text/plain"
+        return (content, etag, media_type, (st.st_mtime_ns, st.st_size))
+
+    @classmethod
+    def _preload(cls, directory: str, max_size: int, exclude: frozenset) -> dict:
+        cache = {}
+        for root, dirs, files in os.walk(directory):
+            if root == directory and exclude:
+                dirs[:] = [d for d in dirs if d not in exclude]
+            for name in files:
+                full_path = os.path.join(root, name)
+                try:
+                    st = os.stat(full_path)
+                    if st.st_size > max_size:
+                        continue
+                    cache[os.path.relpath(full_path, directory)] = cls._load(full_path, name, st)
+                except OSError:
+                    continue
+        return cache
+
+    def _lookup(self, key: str):
+        """Cached entry for key, reloaded if the file changed; None when it should fall through to disk."""
+        cached = self._cache.get(key)
+        if cached is None:
+            return None
+        full_path = os.path.join(self._root, key)
+        try:
+            st = os.stat(full_path)
+            if cached[3] == (st.st_mtime_ns, st.st_size):
+                return cached
+            if st.st_size > self._max_size:
+                raise OSError("file grew past the cache limit")
+            cached = self._cache[key] = self._load(full_path, key, st)
+            return cached
+        except OSError:
+            # 삭제/대용량화된 파일은 캐시에서 빼고 StaticFiles 에 맡김
+            self._cache.pop(key, None)
+            return None
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if scope["method"] in ("GET", "HEAD"):
+            key = path
+            if self.html and scope["path"].endswith("/"):
+                key = os.path.normpath(os.path.join(path, "index.html"))
+            cached = self._lookup(key)
+            if cached is not None:
+                content, etag, media_type, _ = cached
+                if_none_match = Headers(scope=scope).get("if-none-match", "")
+                if etag in (tag.strip() for tag in if_none_match.split(",")):
+                    return Response(status_code=304, headers={"ETag": etag})
+                return Response(content, media_type=media_type, headers={"ETag": etag})
+        return await super().get_response(path, scope)
@@ -1,16 +1,24 @@
 import uvicorn
 import logging
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 import os
+import re
+import stat
+import asyncio
+import importlib.util
 
 # Config & Services
 from core.config import settings
+from core.responses import ORJSONResponse
+from core.static_files import CachedStaticFiles
 from routers import mmd, emd, admin
 from services.data_loader import data_loader
+from services.firebase_service import firebase_manager
+from services.temp_files import sweep_forever
 
 # 로깅 설정
 logging.basicConfig(
@@ -25,11 +33,24 @@ async def lifespan(app: FastAPI):
     """서버 수명주기 관리 - 시작 시 CSV 데이터를 메모리에 로드"""
     logger.info("Server starting up...")
     data_loader.load_csv_to_memory()
+    firebase_manager.start_executor()
+    # 전용 업로드 임시 폴더(tmpfs)만 정리 (TEMP_DIR 의 업로드 이력은 유지)
+    sweeper = None
+    if settings.UPLOAD_TMP_DIR != settings.TEMP_DIR:
+        sweeper = asyncio.create_task(sweep_forever(settings.UPLOAD_TMP_DIR, settings.UPLOAD_TMP_MAX_AGE))
     yield
     logger.info("Server shutting down...")
+    if sweeper is not None:
+        sweeper.cancel()
+    firebase_manager.shutdown_executor()
 
 
-app = FastAPI(title=settings.PROJECT_NAME, version=settings.VERSION, lifespan=lifespan)
+app = FastAPI(
+    title=settings.PROJECT_NAME,
+    version=settings.VERSION,
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -43,20 +64,53 @@ app.include_router(mmd.router)
 app.include_router(emd.router)
 app.include_router(admin.router)
 
+# 경로는 시작 시 한 번만 계산
+_OUTPUT_DIR = settings.OUTPUT_DIR
+_OUTPUT_PREFIX = _OUTPUT_DIR + os.sep
+_ASSETS_DIR = os.path.join(settings.FRONTEND_DIR, "assets")
+
+# 생성 파일명 규칙(영숫자/밑줄/점/하이픈)만 허용 - 경로 구분자가 들어올 수 없음
+_SAFE_NAME = re.compile(r'[\w.\-]+')
+
+
 @app.get("/api/download/{filename}")
 async def download_file(filename: str):
-    file_path = os.path.join(settings.OUTPUT_DIR, filename)
-    if os.path.exists(file_path):
-        return FileResponse(file_path)
-    return {"error": "File not found"}
-
-# Static Files
-if os.path.exists(os.path.join(settings.FRONTEND_DIR, "assets")):
-    app.mount("/assets", StaticFiles(directory=os.path.join(settings.FRONTEND_DIR, "assets")), name="assets")
+    # Security: prevent directory traversal
+    if not _SAFE_NAME.fullmatch(filename) or '..' in filename:
+        raise HTTPException(400, "Invalid filename")
+    file_path = _OUTPUT_PREFIX + filename
+    try:
+        stat_result = os.stat(file_path)
+    except OSError:
+        return {"error": "File not found"}
+    if not stat.S_ISREG(stat_result.st_mode):
+        return {"error": "File not found"}
+    # stat_result 를 넘겨 FileResponse 가 다시 stat 하지 않도록 함 (전송은 sendfile 사용)
+    return FileResponse(file_path, stat_result=stat_result, filename=filename)
+
+# Static Files (마운트 여부도 시작 시 한 번만 결정)
+if os.path.exists(_ASSETS_DIR):
+    app.mount("/assets", CachedStaticFiles(directory=_ASSETS_DIR), name="assets")
 if os.path.exists(settings.DATA_DIR):
     app.mount("/data", StaticFiles(directory=settings.DATA_DIR), name="data")
 if os.path.exists(settings.FRONTEND_DIR):
-    app.mount("/", StaticFiles(directory=settings.FRONTEND_DIR, html=True), name="frontend")
+    # assets 는 위의 /assets 마운트가 담당하므로 중복 적재하지 않음
+    app.mount("/", CachedStaticFiles(directory=settings.FRONTEND_DIR, html=True, exclude=("assets",)), name="frontend")
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="127.0.0.1", port=8001, reload=True)
\ No newline at end of file
+    # uvloop/httptools 는 uvicorn[standard] 로 설치됨 (uvloop 은 Windows 미지원 → asyncio 사용)
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    # 운영 환경: API_RELOAD=false, API_WORKERS=N (reload 는 단일 워커에서만 동작)
+    workers = max(1, int(os.getenv("API_WORKERS", "1")))
+    reload = os.getenv("API_RELOAD", "true").strip().lower() == "true" and workers == 1
+    uvicorn.run(
+        "main:app",
+        # 관리용 엔드포인트에 인증이 없으므로 로컬 바인딩 고정 (.env 의 API_HOST 는 사용하지 않음)
+        host="127.0.0.1",
+        port=int(os.getenv("API_PORT", "8001")),
+        reload=reload,
+        workers=workers,
+        loop=loop,
+        http=http,
+    )
\ No newline at end of file
@@ -1,17 +1,20 @@
 from fastapi import APIRouter, HTTPException, Body, UploadFile, File
 from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
 import os
-import json
-import glob
+import asyncio
+import orjson
 import logging
 import shutil
 from datetime import datetime
+from types import MappingProxyType
 from typing import Dict, Any
 
 # Config & Services
 from core.config import settings
-from services.data_loader import data_loader
-from services.firebase_service import firebase_manager
+from services.data_loader import data_loader, normalize_location
+from services.firebase_service import firebase_manager, doc_field
+from services.history_reader import iter_json_files, load_json_files
 
 # 로깅 설정
 logger = logging.getLogger(__name__)
@@ -24,37 +27,84 @@ CONFIG_FILE = os.path.join(settings.DATA_DIR, "system_config.json")
 
 # --- 1. 시스템 설정 관리 (System Settings) ---
 
-DEFAULT_CONFIG = {
+# 읽기 전용 뷰 - 호출자가 실수로 기본값을 수정할 수 없음
+DEFAULT_CONFIG = MappingProxyType({
     "safety_stock": 0,
     "pallet_max_height": 68,
     "pallet_max_weight": 2500,
     "pallet_base_weight": 40
-}
+})
+
+# 설정 파일 캐시: (mtime_ns, size) 가 같으면 파싱 없이 재사용
+_CFG_CACHE = {"key": None, "data": None}
+
+def _config_file_key():
+    st = os.stat(CONFIG_FILE)
+    return (st.st_mtime_ns, st.st_size)
 
 def load_config():
-    if not os.path.exists(CONFIG_FILE):
-        return DEFAULT_CONFIG
+    """
+    Return the current system config as a read-only mapping.
+    Cache hits share one MappingProxyType view; copy with dict() before modifying.
+    """
     try:
-        with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-            loaded = json.load(f)
-            return {**DEFAULT_CONFIG, **loaded}
-    except Exception as e:
-        logger.error(f"Failed to load config: {e}")
+        key = _config_file_key()
+    except OSError:
         return DEFAULT_CONFIG
 
+    if _CFG_CACHE["key"] != key or _CFG_CACHE["data"] is None:
+        try:
+            with open(CONFIG_FILE, 'rb') as f:
+                loaded = orjson.loads(f.read())
+            # JSON 은 맞지만 객체가 아닌 경우(list/number/null)도 기본값으로 대체
+            if not isinstance(loaded, dict):
+                logger.error(f"Failed to load config: expected a JSON object, got {type(loaded).__name__}")
+                return dict(DEFAULT_CONFIG)
+            data = MappingProxyType({**DEFAULT_CONFIG, **loaded})
+        except Exception as e:
+            logger.error(f"Failed to load config: {e}")
+            return dict(DEFAULT_CONFIG)
+        _CFG_CACHE["data"] = data
+        _CFG_CACHE["key"] = key
+
+    return _CFG_CACHE["data"]
+
+def _fsync_dir(path):
+    # 디렉터리 fsync 는 POSIX 전용 (Windows 에서는 디렉터리를 열 수 없음)
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
 def save_config(config_data):
     os.makedirs(settings.DATA_DIR, exist_ok=True)
-    with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-        json.dump(config_data, f, indent=4)
+    # 임시 파일에 쓴 뒤 os.replace 로 교체 → 읽는 쪽은 항상 완전한 파일만 보게 됨
+    tmp_path = CONFIG_FILE + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(orjson.dumps(config_data, option=orjson.OPT_INDENT_2))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, CONFIG_FILE)
+    _fsync_dir(settings.DATA_DIR)
+    # write-through: 다음 조회 시 다시 파싱하지 않도록 캐시 갱신
+    _CFG_CACHE["data"] = MappingProxyType({**DEFAULT_CONFIG, **config_data})
+    _CFG_CACHE["key"] = _config_file_key()
 
 @router.get("/settings")
 async def get_settings():
-    return {"status": "success", "data": load_config()}
+    return {"status": "success", "data": dict(load_config())}
 
 @router.post("/settings")
 async def update_settings(payload: Dict[str, Any] = Body(...)):
     try:
-        current = load_config()
+        # 캐시된 읽기 전용 뷰를 복사해 새 dict 로 수정
+        current = dict(load_config())
         # 값 업데이트 (숫자 변환)
         current['safety_stock'] = int(payload.get('safety_stock', current.get('safety_stock', DEFAULT_CONFIG['safety_stock'])))
         current['pallet_max_height'] = int(payload.get('pallet_max_height', current['pallet_max_height']))
@@ -69,31 +119,31 @@ async def update_settings(payload: Dict[str, Any] = Body(...)):
 
 # --- 2. PO 처리 이력 조회 (PO History) ---
 
+def _load_history():
+    """outputs/history/**/*.json 검색 + 병렬 읽기 (워커 스레드에서 호출)"""
+    return load_json_files(list(iter_json_files(HISTORY_DIR)))
+
+
 @router.get("/history")
 async def get_po_history():
     try:
-        # outputs/history/**/*.json 파일 검색
-        pattern = os.path.join(HISTORY_DIR, "**", "*.json")
-        files = glob.glob(pattern, recursive=True)
-        
+        # outputs/history/**/*.json 파일 검색 + 읽기는 이벤트 루프 밖에서 수행
         history_list = []
-        for fpath in files:
+        for fpath, data in await run_in_threadpool(_load_history):
             try:
-                with open(fpath, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    meta = data.get('meta', {})
-                    
-                    # 파일명에서 날짜/시간 추출이 가능하지만 meta 정보 우선 사용
-                    history_list.append({
-                        "file_path": fpath, # 삭제 시 필요
-                        "filename": os.path.basename(fpath),
-                        "source": meta.get('source', 'Unknown'),
-                        "customer": meta.get('customer', 'Unknown'),
-                        "timestamp": meta.get('timestamp', ''),
-                        # 결과 파일 링크 추정 (JSON 데이터 내부에 있거나, 파일명 규칙으로 유추)
-                        # 여기서는 단순화를 위해 JSON 내부에 저장된 files 정보가 있다면 사용
-                        "files": data.get('data', {}).get('files', {}) 
-                    })
+                meta = data.get('meta', {})
+                
+                # 파일명에서 날짜/시간 추출이 가능하지만 meta 정보 우선 사용
+                history_list.append({
+                    "file_path": fpath, # 삭제 시 필요
+                    "filename": os.path.basename(fpath),
+                    "source": meta.get('source', 'Unknown'),
+                    "customer": meta.get('customer', 'Unknown'),
+                    "timestamp": meta.get('timestamp', ''),
+                    # 결과 파일 링크 추정 (JSON 데이터 내부에 있거나, 파일명 규칙으로 유추)
+                    # 여기서는 단순화를 위해 JSON 내부에 저장된 files 정보가 있다면 사용
+                    "files": data.get('data', {}).get('files', {}) 
+                })
             except Exception as e:
                 logger.warning(f"Failed to parse history file {fpath}: {e}")
                 continue
@@ -119,6 +169,8 @@ async def delete_po_history(payload: Dict[str, str] = Body(...)):
 
 # --- 3. SKU 검사 도구 (Quick Check) ---
 
+EMPTY_INVENTORY = {"total": 0, "locations": {"MAIN": 0, "SUB": 0}}
+
 @router.get("/sku_check/{sku}")
 async def check_sku(sku: str):
     """
@@ -129,8 +181,9 @@ async def check_sku(sku: str):
     # 기본 정보 (CSV 메모리) - Use product_map instead of products
     csv_info = data_loader.product_map.get(target_sku, {})
     
-    # Get inventory from memory cache - Use inventory_map instead of inventory
-    inv_info = data_loader.inventory_map.get(target_sku, {"total": 0, "locations": {}})
+    # Get inventory from memory cache (이미 로드 시점에 MAIN/SUB 합계가 집계되어 있음)
+    inv_info = data_loader.inventory_map.get(target_sku, EMPTY_INVENTORY)
+    inv_locations = inv_info["locations"]
     
     result = {
         "sku": target_sku,
@@ -140,11 +193,11 @@ async def check_sku(sku: str):
         "pack": int(csv_info.get('UnitsPerCase') or 1),
         "weight": float(csv_info.get('MasterCarton_Weight_lbs') or 0),
         "height": float(csv_info.get('MasterCarton_Height_inches') or 0),
-        "stock": inv_info.get("total", 0),
+        "stock": inv_info["total"],
         # New: Split inventory by location
-        "stock_main": inv_info.get("locations", {}).get("MAIN", 0),
-        "stock_sub": inv_info.get("locations", {}).get("SUB", 0),
-        "locations": inv_info.get("locations", {}),
+        "stock_main": inv_locations.get("MAIN", 0),
+        "stock_sub": inv_locations.get("SUB", 0),
+        "locations": inv_locations,
     }
     
     if csv_info:
@@ -154,8 +207,13 @@ async def check_sku(sku: str):
     db = firebase_manager.get_db()
     if db:
         try:
+            # Product + Inventory 조회를 이벤트 루프 밖에서 동시에 실행
+            doc, inventory_docs = await asyncio.gather(
+                firebase_manager.run(db.collection('products').document(target_sku).get),
+                firebase_manager.fetch_inventory_bulk([target_sku]),
+            )
+            
             # Product
-            doc = db.collection('products').document(target_sku).get()
             if doc.exists:
                 d = doc.to_dict()
                 result.update({
@@ -168,23 +226,23 @@ async def check_sku(sku: str):
                 })
             
             # Inventory with location split (MAIN vs SUB)
-            locations = {}
-            total_stock = 0
-            docs = db.collection('inventory').where('sku', '==', target_sku).stream()
-            for d in docs:
-                doc_data = d.to_dict()
-                on_hand = int(doc_data.get('onHand', 0))
-                location = str(doc_data.get('location', 'MAIN')).strip().upper()
-                
-                if location not in locations:
-                    locations[location] = 0
-                locations[location] += on_hand
-                total_stock += on_hand
-            
-            result['stock'] = total_stock
-            result['stock_main'] = locations.get('MAIN', 0)
-            result['stock_sub'] = locations.get('SUB', 0)
-            result['locations'] = locations
+            # 조회 실패한 SKU 는 결과에 없음 → CSV 재고 값 유지
+            sku_inventory_docs = inventory_docs.get(target_sku)
+            if sku_inventory_docs is not None:
+                locations = {'MAIN': 0, 'SUB': 0}
+                total_stock = 0
+                for d in sku_inventory_docs:
+                    # 필요한 두 필드만 읽음 (to_dict() 전체 변환 생략)
+                    on_hand = int(doc_field(d, 'onHand', 0))
+                    location = normalize_location(doc_field(d, 'location', 'MAIN'))
+
+                    locations[location] = locations.get(location, 0) + on_hand
+                    total_stock += on_hand
+
+                result['stock'] = total_stock
+                result['stock_main'] = locations.get('MAIN', 0)
+                result['stock_sub'] = locations.get('SUB', 0)
+                result['locations'] = locations
             
         except Exception as e:
             result['error'] = str(e)
@@ -216,40 +274,35 @@ async def get_reviewed_pos():
     This queries the history directory for POs that have been processed and reviewed.
     """
     try:
-        pattern = os.path.join(HISTORY_DIR, "**", "*.json")
-        files = glob.glob(pattern, recursive=True)
-        
         reviewed_list = []
-        for fpath in files:
+        for fpath, data in await run_in_threadpool(_load_history):
             try:
-                with open(fpath, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    meta = data.get('meta', {})
-                    result_data = data.get('data', {})
-                    
-                    # Extract PO information
-                    po_number = meta.get('po_number', 'Unknown')
-                    buyer_name = meta.get('buyer_name', meta.get('customer', 'Unknown'))
-                    review_date = meta.get('timestamp', '')
-                    
-                    # Extract summary stats from result data
-                    summary = result_data.get('summary', {})
-                    total_skus = summary.get('total_skus', 0)
-                    total_units = summary.get('total_units', 0)
-                    
-                    # Determine status based on shortage count
-                    shortage_count = summary.get('shortage_skus_count', 0)
-                    status = 'Approved' if shortage_count == 0 else 'Pending Review'
-                    
-                    reviewed_list.append({
-                        'po_number': po_number,
-                        'buyer_name': buyer_name,
-                        'review_date': review_date,
-                        'total_skus': total_skus,
-                        'total_units': total_units,
-                        'status': status,
-                        'file_path': fpath
-                    })
+                meta = data.get('meta', {})
+                result_data = data.get('data', {})
+                
+                # Extract PO information
+                po_number = meta.get('po_number', 'Unknown')
+                buyer_name = meta.get('buyer_name', meta.get('customer', 'Unknown'))
+                review_date = meta.get('timestamp', '')
+                
+                # Extract summary stats from result data
+                summary = result_data.get('summary', {})
+                total_skus = summary.get('total_skus', 0)
+                total_units = summary.get('total_units', 0)
+                
+                # Determine status based on shortage count
+                shortage_count = summary.get('shortage_skus_count', 0)
+                status = 'Approved' if shortage_count == 0 else 'Pending Review'
+                
+                reviewed_list.append({
+                    'po_number': po_number,
+                    'buyer_name': buyer_name,
+                    'review_date': review_date,
+                    'total_skus': total_skus,
+                    'total_units': total_units,
+                    'status': status,
+                    'file_path': fpath
+                })
             except Exception as e:
                 logger.warning(f"Failed to parse reviewed PO file {fpath}: {e}")
                 continue
@@ -399,7 +452,8 @@ async def upload_inventory(file: UploadFile = File(...)):
                     return JSONResponse({"status": "error", "message": "File size exceeds 10MB limit"})
                 buffer.write(chunk)
         
-        # Sync to Firebase
+        # 메모리 재고 캐시 갱신 후 Firebase 동기화
+        data_loader.load_inventory()
         result = await data_loader.sync_inventory()
         return JSONResponse(result)
     except Exception as e:
@@ -1,14 +1,15 @@
 from fastapi import APIRouter, HTTPException, Body
+from fastapi.concurrency import run_in_threadpool
 from typing import List, Dict, Any
-import math
+import asyncio
 import os
 import logging
-import pandas as pd
-from datetime import datetime
+from firebase_admin import firestore
 
 # Config & Services
 from core.config import settings
-from services.firebase_service import firebase_manager
+from core.responses import ORJSONResponse
+from services.firebase_service import firebase_manager, doc_field
 from services.palletizer_emd import PalletizerEMD
 from services.document_generator import DocumentGenerator
 from services.data_loader import data_loader
@@ -19,22 +20,34 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/emd", tags=["EMD"])
 
 # --- Helper: 안전한 값 추출 ---
+# 숫자/None 은 예외 처리 없이 바로 반환 (가장 흔한 입력)
 def safe_float(val, default=0.0):
+    val_type = type(val)
+    if val_type is float or val_type is int:
+        return float(val)
+    if val is None:
+        return default
     try: return float(val)
     except Exception:
         return default
 
 def safe_int(val, default=1):
+    if type(val) is int:
+        return val
+    if val is None:
+        return default
     try: return int(val)
     except Exception:
         return default
 
-# --- Helper: 정보 조회 (CSV -> Firebase 순서) ---
-def get_item_info(sku):
-    target_sku = str(sku).strip()
-    
-    # 1. 기본값
-    item_data = {
+SEARCH_RESULT_LIMIT = 10
+
+# 요청마다 새로 만들지 않고 재사용 (요청별 상태 없음, 팔레트 설정은 변경 시 자동 반영)
+PALLETIZER = PalletizerEMD()
+DOC_GEN = DocumentGenerator(settings.OUTPUT_DIR)
+
+def _default_item(target_sku):
+    return {
         'sku': target_sku,
         'desc': 'Unknown Item',
         'price': 0.0,
@@ -46,93 +59,119 @@ def get_item_info(sku):
         'source': 'None'
     }
 
-    # 2. CSV 메모리 조회 (data_loader)
-    if target_sku in data_loader.products:
-        prod = data_loader.products[target_sku]
-        
-        price = prod.get('KeyAccountPrice_TJX') or prod.get('WholesalePrice') or 0
-        pack = prod.get('UnitsPerCase') or 1
-        weight = prod.get('MasterCarton_Weight_lbs') or 15
-        height = prod.get('MasterCarton_Height_inches') or 10
-        
-        item_data.update({
-            'desc': str(prod.get('ProductName_Short', 'Unknown Item')),
-            'price': safe_float(price),
-            'pack_size': safe_int(pack),
-            'weight': safe_float(weight),
-            'height': safe_float(height),
-            'is_valid': True,
-            'source': 'CSV'
-        })
-    
-    # 3. CSV 재고 조회
-    if target_sku in data_loader.inventory:
-        item_data['stock'] = int(data_loader.inventory[target_sku])
+# --- Helper: 정보 조회 (CSV -> Firebase 순서) ---
+async def get_items_info(skus: List[str]) -> List[Dict[str, Any]]:
+    """
+    Batch lookup of item info (CSV memory first, then Firebase overrides).
+    Firebase is queried with one get_all() for products and concurrent chunked
+    'in' queries for inventory instead of per-SKU round-trips.
+
+    Returns:
+        List of item dicts aligned with the input order
+    """
+    target_skus = [str(sku).strip() for sku in skus]
+    items = {}
+
+    # 1. 기본값 + 2. CSV 메모리 조회 (data_loader)
+    products = data_loader.products
+    inventory = data_loader.inventory
+    for target_sku in target_skus:
+        if target_sku in items:
+            continue
+        item_data = _default_item(target_sku)
+
+        prod = products.get(target_sku)
+        if prod is not None:
+            price = prod.get('KeyAccountPrice_TJX') or prod.get('WholesalePrice') or 0
+            pack = prod.get('UnitsPerCase') or 1
+            weight = prod.get('MasterCarton_Weight_lbs') or 15
+            height = prod.get('MasterCarton_Height_inches') or 10
+            
+            item_data.update({
+                'desc': str(prod.get('ProductName_Short', 'Unknown Item')),
+                'price': safe_float(price),
+                'pack_size': safe_int(pack),
+                'weight': safe_float(weight),
+                'height': safe_float(height),
+                'is_valid': True,
+                'source': 'CSV'
+            })
+
+        # 3. CSV 재고 조회 (inventory_map 값은 {"total", "locations"} 형태)
+        inv = inventory.get(target_sku)
+        if inv is not None:
+            item_data['stock'] = int(inv.get('total', 0)) if isinstance(inv, dict) else int(inv)
+
+        items[target_sku] = item_data
 
     # 4. Firebase 조회 (연결된 경우)
     db = firebase_manager.get_db()
-    if db:
-        try:
-            # (A) Product 정보
-            doc = db.collection('products').document(target_sku).get()
-            if doc.exists:
-                d = doc.to_dict()
-                price = d.get('KeyAccountPrice_TJX') or d.get('WholesalePrice') or 0
-                pack = d.get('UnitsPerCase') or 1
-                weight = d.get('MasterCarton_Weight_lbs') or 15
-                height = d.get('MasterCarton_Height_inches') or 10
-                
-                item_data.update({
-                    'desc': d.get('ProductName_Short', item_data['desc']),
-                    'price': safe_float(price),
-                    'pack_size': safe_int(pack),
-                    'weight': safe_float(weight),
-                    'height': safe_float(height),
-                    'is_valid': True,
-                    'source': 'Firebase'
-                })
-
-            # (B) Inventory 정보 (실시간 합산)
-            stock_query = db.collection('inventory').where('sku', '==', target_sku).stream()
-            stock_sum = 0
-            found_stock = False
-            for doc in stock_query:
-                found_stock = True
-                stock_sum += safe_int(doc.to_dict().get('onHand'))
-            
-            if found_stock:
-                item_data['stock'] = stock_sum
-                
-        except Exception as e:
-            logger.warning(f"DB Error ({target_sku}): {e}")
+    # 빈 SKU 와 '/' 포함 SKU 는 문서 id 가 될 수 없으므로 Firebase 조회에서 제외 (CSV 값 유지)
+    unique_skus = [sku for sku in items if sku and '/' not in sku]
+    if db and unique_skus:
+        # (A) Product 정보 (get_all, 300개 단위 청크) + (B) Inventory 정보 (30개 단위 'in' 쿼리)
+        # 두 조회는 서로 독립적이므로 이벤트 루프 밖에서 동시에 실행, 한쪽 실패가 다른 쪽 결과를 버리지 않음
+        product_docs, inventory_docs = await asyncio.gather(
+            firebase_manager.fetch_documents_bulk('products', unique_skus),
+            firebase_manager.fetch_inventory_bulk(unique_skus),
+            return_exceptions=True,
+        )
 
-    return item_data
+        if isinstance(product_docs, Exception):
+            logger.warning(f"DB Error reading products ({len(unique_skus)} SKUs): {product_docs}")
+        else:
+            for sku, doc in product_docs.items():
+                if sku not in items:
+                    continue
+                try:
+                    d = doc.to_dict()
+                    item_data = items[sku]
+                    price = d.get('KeyAccountPrice_TJX') or d.get('WholesalePrice') or 0
+                    pack = d.get('UnitsPerCase') or 1
+                    weight = d.get('MasterCarton_Weight_lbs') or 15
+                    height = d.get('MasterCarton_Height_inches') or 10
+
+                    item_data.update({
+                        'desc': d.get('ProductName_Short', item_data['desc']),
+                        'price': safe_float(price),
+                        'pack_size': safe_int(pack),
+                        'weight': safe_float(weight),
+                        'height': safe_float(height),
+                        'is_valid': True,
+                        'source': 'Firebase'
+                    })
+                except Exception as e:
+                    logger.warning(f"DB Error for SKU {sku}: {e}")
+
+        # Inventory 실시간 합산
+        if isinstance(inventory_docs, Exception):
+            logger.warning(f"DB Error reading inventory ({len(unique_skus)} SKUs): {inventory_docs}")
+        else:
+            for sku, docs in inventory_docs.items():
+                if docs and sku in items:
+                    items[sku]['stock'] = sum(safe_int(doc_field(doc, 'onHand')) for doc in docs)
+
+    return [items[target_sku] for target_sku in target_skus]
 
 # --- API Endpoints ---
 
 @router.get("/search_customers")
 async def search_customers(query: str):
     if not query: return {"status": "success", "data": []}
-    q = query.lower()
     results = []
-    # data_loader에 로드된 바이어 리스트 사용
-    for buyer in data_loader.buyers:
-        name = str(buyer.get('Name', buyer.get('Customer Name', '')))
-        if q in name.lower():
-            results.append({'name': name, 'data': buyer})
-            if len(results) > 10: break
+    # data_loader에 로드된 바이어 인덱스 사용
+    for name, buyer in data_loader.search_buyers(query, limit=SEARCH_RESULT_LIMIT):
+        results.append({'name': name, 'data': buyer})
     return {"status": "success", "data": results}
 
 @router.post("/validate_skus")
 async def validate_skus(payload: Dict[str, Any] = Body(...)):
     try:
         raw_skus = payload.get('skus', [])
-        sku_list = list(set([str(s).strip() for s in raw_skus if str(s).strip()]))
+        # 입력 순서를 유지하며 중복 제거 (단일 패스)
+        sku_list = list(dict.fromkeys(s for s in (str(raw).strip() for raw in raw_skus) if s))
         
-        result = []
-        for sku in sku_list:
-            info = get_item_info(sku)
-            result.append(info)
+        result = await get_items_info(sku_list)
             
         return {"status": "success", "data": result}
         
@@ -153,7 +192,7 @@ async def process_order(payload: Dict[str, Any] = Body(...)):
             if unit_qty <= 0: continue
             
             pack_size = safe_int(item.get('pack_size'), 1)
-            case_qty = math.ceil(unit_qty / pack_size)
+            case_qty = -(-unit_qty // pack_size)
             
             pallet_input.append({
                 'SKU': item['sku'], 'Qty': case_qty, 'unit_qty': unit_qty,
@@ -162,10 +201,10 @@ async def process_order(payload: Dict[str, Any] = Body(...)):
                 'box_height': safe_float(item.get('height'), 10)
             })
             
-        palletizer = PalletizerEMD()
+        palletizer = PALLETIZER
         pallets = palletizer.calculate_pallets(pallet_input)
         
-        doc_gen = DocumentGenerator(settings.OUTPUT_DIR)
+        doc_gen = DOC_GEN
         
         customer_name = order_info.get('customer_name', 'Manual Customer')
         emd_lookup = {'EMD': {'Customer': customer_name, 'PL Ship to': customer_name}}
@@ -174,20 +213,22 @@ async def process_order(payload: Dict[str, Any] = Body(...)):
         for p in pallets:
             for i in p['items']:
                 pl_rows.append({'DC #': 'EMD', 'SKU': i['sku'], 'Qty (Cases)': i['qty']})
-        pl_df = pd.DataFrame(pl_rows)
         
-        import_url = doc_gen.generate_order_import(
-            pl_df, emd_lookup, 
+        # xlsx 생성은 워커 스레드에서 수행 (이벤트 루프 차단 방지)
+        import_url = await run_in_threadpool(
+            doc_gen.generate_order_import_rows,
+            pl_rows, emd_lookup, 
             order_info.get('site', 'Sub WH'), 
             {'EMD': order_info.get('po_number', '')},
             order_info.get('ship_window', '')
         )
         
-        return {
+        # pallet_plan 은 직접 orjson 으로 직렬화 (dict 반환 시의 jsonable_encoder 순회 생략)
+        return ORJSONResponse({
             "status": "success",
             "files": {"order_import": import_url},
             "pallet_plan": pallets
-        }
+        })
         
     except Exception as e:
         logger.error(f"Process Error: {e}")
@@ -210,11 +251,11 @@ async def submit_order(payload: Dict[str, Any] = Body(...)):
             "pickup_date": payload.get('pickup_date'),
             "items": payload.get('items', []),
             "status": "Pending",
-            "created_at": datetime.now(),
+            "created_at": firestore.SERVER_TIMESTAMP,
             "source": "Customer Portal"
         }
         
-        db.collection('orders').add(order_data)
+        await firebase_manager.run(db.collection('orders').add, order_data)
         return {"status": "success", "message": "Order submitted successfully"}
         
     except Exception as e:
@@ -1,26 +1,36 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Body
-from fastapi.responses import JSONResponse, FileResponse, Response
+from fastapi import APIRouter, UploadFile, File, HTTPException, Body, BackgroundTasks
+from fastapi.responses import FileResponse
+from fastapi.concurrency import run_in_threadpool
 import os
+import asyncio
 import shutil
-import math
 import logging
+import numpy as np
 import pandas as pd
 import uuid
-import json
+import orjson
+import pickle
+import hashlib
 import re
-import heapq
+from bisect import insort
+from collections import defaultdict
+from operator import itemgetter
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from types import MappingProxyType
+from typing import Collection, Dict, Any, List, Optional
 
 # Config & Services
 from core.config import settings
+from core.responses import ORJSONResponse
 from services.po_parser import parse_po, parse_po_to_order_data
 from services.validator import validate_po_data, get_validation_summary, resolve_safety_stock
 from services.palletizer import Palletizer
-from services.document_generator import DocumentGenerator
-from services.firebase_service import firebase_manager
-from services.data_loader import data_loader
-from services.utils import safe_int, safe_float, sanitize_for_json
+from services.document_generator import DocumentGenerator, read_xlsx_rows
+from services.firebase_service import firebase_manager, doc_field
+from services.data_loader import data_loader, normalize_location
+from services.temp_files import clear_dir
+from services.history_reader import iter_json_files, load_json_files_cached
+from services.utils import safe_int, safe_float, sanitize_for_json, norm_sku, TTLCache
 
 # 로깅 설정
 logger = logging.getLogger(__name__)
@@ -29,15 +39,74 @@ router = APIRouter(prefix="/api", tags=["MMD"])
 
 SKU_PREVIEW_LIMIT = 5
 
+# Firestore 에서 가져온 상품 정보 캐시 (analyze_po -> calculate_pallets 재조회 방지)
+PRODUCT_CACHE_SIZE = 50_000
+PRODUCT_CACHE_TTL = 300
+_PRODUCT_CACHE = TTLCache(PRODUCT_CACHE_SIZE, PRODUCT_CACHE_TTL)
+
+# Firestore 재고 집계 캐시: 재고는 변동이 잦으므로 재시도/새로고침 구간만 커버하도록 짧게 유지
+# 값은 (((location, onHand 합계), ...), total) 이며 재고 문서가 없는 SKU 도 빈 결과로 저장
+STOCK_CACHE_SIZE = 50_000
+STOCK_CACHE_TTL = 30
+_STOCK_CACHE = TTLCache(STOCK_CACHE_SIZE, STOCK_CACHE_TTL)
+
+# 동일 PDF 재업로드 시 파싱 결과 재사용 (파일 내용 해시 키, 재고 검증은 매번 수행)
+PARSE_CACHE_SIZE = 32
+PARSE_CACHE_TTL = 1800
+_PARSE_CACHE = TTLCache(PARSE_CACHE_SIZE, PARSE_CACHE_TTL)
+
+# 요청마다 새로 만들지 않고 재사용 (요청별 상태 없음, 팔레트 설정은 변경 시 자동 반영)
+PALLETIZER = Palletizer()
+DOC_GEN = DocumentGenerator(settings.OUTPUT_DIR)
+
 # DC 정보 로드 (캐싱)
-DC_LOOKUP = {}
 division_path = os.path.join(settings.DATA_DIR, "TJX_PO_Template-division_info.csv")
-if os.path.exists(division_path):
+DC_LOOKUP_PICKLE = os.path.join(settings.TEMP_DIR, "division_info.pkl")
+
+
+def _load_dc_lookup(csv_path: str, pickle_path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Load the DC lookup, reusing a pickled copy while the CSV is unchanged.
+    The pickle stores the CSV's (mtime_ns, size) and is rebuilt when they differ.
+    """
+    try:
+        st = os.stat(csv_path)
+    except FileNotFoundError:
+        return {}
+    key = (st.st_mtime_ns, st.st_size)
+    try:
+        with open(pickle_path, "rb") as f:
+            cached_key, lookup = pickle.load(f)
+        if cached_key == key:
+            return lookup
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+        pass
+
     try:
-        df = pd.read_csv(division_path, dtype={'DC#': str})
-        for _, row in df.iterrows(): DC_LOOKUP[str(row['DC#']).strip()] = row.to_dict()
+        df = pd.read_csv(csv_path, dtype={'DC#': str})
+        # iterrows 대신 한 번에 레코드 변환 (중복 DC# 는 기존처럼 마지막 행 우선)
+        lookup = dict(zip(df['DC#'].astype(str).str.strip(), df.to_dict('records')))
     except Exception as e:
         logger.error(f"Failed to load DC lookup CSV: {e}")
+        return {}
+
+    try:
+        tmp_path = f"{pickle_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump((key, lookup), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, pickle_path)
+    except OSError as e:
+        logger.warning(f"Failed to write DC lookup cache: {e}")
+    return lookup
+
+
+DC_LOOKUP = _load_dc_lookup(division_path, DC_LOOKUP_PICKLE)
+
+# 파일명/PO 번호 정리용 정규식 (요청마다 re 캐시 조회 없이 재사용)
+_SAFE_FILE_RE = re.compile(r'[^\w\-\.]')
+_SAFE_PO_RE = re.compile(r'[^\w\-]')
+# upload_temp_excel 이 돌려주는 내용 해시 파일명 (<blake2b 32 hex>.xlsx)
+_UPLOAD_EXCEL_NAME_RE = re.compile(r'[0-9a-f]{32}\.xlsx')
 
 def _sanitize_filename(filename: str) -> str:
     """
@@ -47,36 +116,266 @@ def _sanitize_filename(filename: str) -> str:
     # Remove path components
     filename = os.path.basename(filename)
     # Remove invalid characters (keep alphanumeric, dots, hyphens, underscores)
-    filename = re.sub(r'[^\w\-\.]', '_', filename)
+    filename = _SAFE_FILE_RE.sub('_', filename)
     # Prevent hidden files
     if filename.startswith('.'):
         filename = '_' + filename
     return filename
 
-def _get_stock_value(data: Dict[str, Any], primary_key: str) -> int:
-    return safe_int(data.get(primary_key))
+UPLOAD_COPY_CHUNK = 1024 * 1024  # 1MB
+# calculate_pallets 가 재업로드된 엑셀에서 읽는 컬럼
+PALLET_EXCEL_COLUMNS = ('SKU', 'Final Qty (Units)', 'Final Qty', 'Pack Size', 'DC #', 'Description')
+
+
+def _upload_fd(src) -> Optional[int]:
+    """
+    OS fd of an upload via the public fileno(); None when sendfile or a real fd is unavailable.
+    SpooledTemporaryFile.fileno() rolls an in-memory upload (<= 1MB in Starlette) over to disk first.
+    """
+    if not hasattr(os, "sendfile"):
+        return None
+    try:
+        return src.fileno()
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def _copy_upload(src, path: str) -> None:
+    with open(path, "wb") as buffer:
+        src_fd = _upload_fd(src)
+        if src_fd is not None:
+            # 디스크로 넘어간 업로드는 커널 내부 복사 (sendfile, 파이썬 버퍼 경유 없음)
+            offset = src.tell()
+            try:
+                while sent := os.sendfile(buffer.fileno(), src_fd, offset, UPLOAD_COPY_CHUNK):
+                    offset += sent
+                return
+            except OSError:
+                # sendfile 미지원 파일시스템 등: 처음부터 일반 복사로 재시도
+                buffer.seek(0)
+                buffer.truncate()
+        shutil.copyfileobj(src, buffer, UPLOAD_COPY_CHUNK)
+
+
+def _copy_upload_hashed(src, path: str) -> str:
+    """Copy an upload to path while hashing it; returns the BLAKE2b (16-byte) hex digest."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "wb") as buffer:
+        while chunk := src.read(UPLOAD_COPY_CHUNK):
+            h.update(chunk)
+            buffer.write(chunk)
+    return h.hexdigest()
+
+
+async def _save_upload(upload: UploadFile, path: str) -> None:
+    """Persist an UploadFile to disk on a worker thread so the event loop is not blocked."""
+    await run_in_threadpool(_copy_upload, upload.file, path)
+
+
+def _excel_rows_cache_path(path: str) -> str:
+    return f"{path}.rows.json"
+
+
+def _cache_excel_rows(path: str) -> None:
+    """
+    Parse the pallet columns of an uploaded Excel once and store them next to it as JSON,
+    so calculate_pallets can skip the XML parse. Failures only log (reader falls back to the xlsx).
+    """
+    try:
+        rows = read_xlsx_rows(path, PALLET_EXCEL_COLUMNS)
+        cache_path = _excel_rows_cache_path(path)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(orjson.dumps(rows))
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        logger.warning(f"Failed to cache Excel rows for {path}: {e}")
+
+
+def _load_excel_rows(path: str) -> List[Dict[str, Any]]:
+    """Rows cached by upload_temp_excel when still newer than the xlsx, else parse the xlsx."""
+    cache_path = _excel_rows_cache_path(path)
+    try:
+        if os.stat(cache_path).st_mtime_ns >= os.stat(path).st_mtime_ns:
+            with open(cache_path, 'rb') as f:
+                return orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        pass
+    return read_xlsx_rows(path, PALLET_EXCEL_COLUMNS)
+
+
+def _store_excel_upload(src) -> str:
+    """
+    Save an Excel upload under its content hash (<digest>.xlsx) in UPLOAD_TMP_DIR.
+    Re-uploading identical content reuses the stored file and its cached rows.
+    """
+    tmp_path = os.path.join(settings.UPLOAD_TMP_DIR, f"{uuid.uuid4()}.upload")
+    try:
+        filename = f"{_copy_upload_hashed(src, tmp_path)}.xlsx"
+        path = os.path.join(settings.UPLOAD_TMP_DIR, filename)
+        try:
+            # 같은 내용이 이미 있음: mtime 만 갱신해 정리 대상에서 제외 (캐시가 원본보다 최신 유지)
+            os.utime(path)
+            os.utime(_excel_rows_cache_path(path))
+        except FileNotFoundError:
+            os.replace(tmp_path, path)
+            _cache_excel_rows(path)
+        return filename
+    finally:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+
+
+def _write_review(review_path: str, review_record: Dict[str, Any]) -> None:
+    """Write a review record JSON (runs as a background task after the response is sent)."""
+    try:
+        os.makedirs(os.path.dirname(review_path), exist_ok=True)
+        with open(review_path, 'wb') as f:
+            f.write(orjson.dumps(review_record, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY))
+    except OSError as e:
+        logger.error(f"Failed to save review record {review_path}: {e}")
+
+
+def _file_digest(path: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while chunk := f.read(UPLOAD_COPY_CHUNK):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+async def _parse_po_cached(path: str):
+    """
+    parse_po on a worker thread, memoized by file content hash.
+    Cached item lists are shared between requests and must be treated as read-only.
+    """
+    key = await run_in_threadpool(_file_digest, path)
+    cached = _PARSE_CACHE.get(key)
+    if cached is not None:
+        return cached
+    items, error = await run_in_threadpool(parse_po, path)
+    if not error:
+        _PARSE_CACHE[key] = (items, error)
+    return items, error
+
+
+# validate_po_data 결과에 항상 존재하는 필드 접근자
+_get_available_main = itemgetter('available_main_stock')
+_get_available_sub = itemgetter('available_sub_stock')
+_get_available_total = itemgetter('available_total_stock')
+_get_remaining_shortage = itemgetter('remaining_shortage')
+_get_status = itemgetter('status')
+_get_status_label = itemgetter('status_label')
+_get_price_warning = itemgetter('price_warning')
 
 
-def _is_unregistered_sku(inv_data: Dict[str, Any], sku: str) -> bool:
+# 조회 실패 시 공용으로 쓰는 빈 매핑 (호출마다 {} 를 새로 만들지 않음)
+_EMPTY = MappingProxyType({})
+
+
+def _is_unregistered_sku(inv_data: Dict[str, Any], sku: str, product_map: Dict[str, Dict]) -> bool:
     """
     Determine whether a SKU is unregistered in master data.
 
     Args:
         inv_data: Inventory data for the SKU.
         sku: SKU identifier string.
+        product_map: Product master map (caller binds data_loader.product_map once).
 
     Returns:
         True when no product name exists and the SKU is absent from product_map.
-        Uses an empty dict fallback if product_map is not available on data_loader.
     """
-    product_map = getattr(data_loader, "product_map", None) or {}
     return (inv_data.get('name', '') == '') and (sku not in product_map)
 
 
+def _product_pack_size(product_info: Dict[str, Any]) -> int:
+    """Pack size from product master (UnitsPerCase, then CasePack); values <= 0 become 1."""
+    pack_size = safe_int(product_info.get('UnitsPerCase', product_info.get('CasePack', 1)), 1)
+    return pack_size if pack_size > 0 else 1
+
+
 # --- Helper Functions ---
-def get_inventory_data(sku_list: List[str]) -> Dict[str, Dict]:
+DEFAULT_PRODUCT_DATA = {'price': 0.0, 'pack_size': 1, 'weight': 15.0, 'height': 10.0, 'name': '', 'brand': ''}
+# inventory_map 에 없는 SKU 조회 시 사용하는 읽기 전용 기본값
+_DEFAULT_INV = MappingProxyType({
+    'total': 0, 'locations': MappingProxyType({'MAIN': 0, 'SUB': 0}), **DEFAULT_PRODUCT_DATA
+})
+
+
+def _validator_product_map(inv_map: Dict[str, Dict]) -> Dict[str, Dict]:
+    """Price lookup in the shape validate_po_data expects ({sku: {'KeyAccountPrice_TJX': price}})."""
+    return {sku: {'KeyAccountPrice_TJX': data.get('price', 0.0)} for sku, data in inv_map.items()}
+
+
+def _with_default_inv(inv_map: Dict[str, Dict]) -> Dict[str, Dict]:
+    """Wrap inventory_map so hot loops can index directly (inv_map[sku]) without .get fallbacks."""
+    return defaultdict(lambda: _DEFAULT_INV, inv_map)
+
+
+def _product_from_cache(cached: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a product_map (CSV) row to the inventory_map product fields."""
+    return {
+        'price': float(cached.get('KeyAccountPrice_TJX', 0.0) or 0.0),
+        'pack_size': safe_int(cached.get('UnitsPerCase', 1), 1),
+        'weight': float(cached.get('MasterCarton_Weight_lbs', 15.0) or 15.0),
+        'height': float(cached.get('MasterCarton_Height_inches', 10.0) or 10.0),
+        'name': cached.get('ProductName_Short', ''),
+        'brand': cached.get('Brand', ''),
+    }
+
+
+def _product_from_firestore(p: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a Firestore products document to the inventory_map product fields."""
+    return {
+        'price': safe_float(p.get('KeyAccountPrice_TJX', 0.0), 0.0),
+        'pack_size': safe_int(p.get('UnitsPerCase', 1), 1),
+        'weight': safe_float(p.get('MasterCarton_Weight_lbs', 15.0), 15.0),
+        'height': safe_float(p.get('MasterCarton_Height_inches', 10.0), 10.0),
+        'name': p.get('ProductName_Short', ''),
+        'brand': p.get('Brand', ''),
+    }
+
+
+async def _fetch_products(skus: List[str]) -> Dict[str, Any]:
+    if not skus:
+        return {}
+    try:
+        return await firebase_manager.fetch_documents_bulk('products', skus)
+    except Exception as e:
+        logger.warning(f"Failed to fetch product info from Firebase for {len(skus)} SKUs: {e}")
+        return {}
+
+
+def _aggregate_stock(docs: List[Any]) -> tuple:
+    """Sum onHand per normalized location (WH_MAIN -> MAIN, WH_SUB -> SUB) for one SKU's inventory docs."""
+    locations: Dict[str, int] = {}
+    total = 0
+    for doc in docs:
+        on_hand = safe_int(doc_field(doc, 'onHand', 0), 0)
+        location = normalize_location(doc_field(doc, 'location', 'MAIN'))
+        locations[location] = locations.get(location, 0) + on_hand
+        total += on_hand
+    return tuple(locations.items()), total
+
+
+async def _fetch_inventory(skus: List[str]) -> Optional[Dict[str, List[Any]]]:
+    """Inventory docs grouped by SKU; None when the Firestore query failed (결과를 캐시하지 않도록 구분)."""
+    if not skus:
+        return {}
+    try:
+        return await firebase_manager.fetch_inventory_bulk(skus)
+    except Exception as e:
+        logger.warning(f"Failed to fetch inventory from Firebase for {len(skus)} SKUs: {e}")
+        return None
+
+
+async def get_inventory_data(sku_list: Collection[str]) -> Dict[str, Dict]:
     """
     Fetch inventory data with CACHE-FIRST strategy to minimize Firebase calls.
+    Cache misses are read from Firebase in batches (products via get_all, inventory
+    via 'in' queries) with both lookups running concurrently.
     Returns inventory map with MAIN/SUB split.
     """
     import time
@@ -88,84 +387,90 @@ def get_inventory_data(sku_list: List[str]) -> Dict[str, Dict]:
     logger.info(f"Fetching inventory for {len(sku_list)} SKUs (cache-first strategy)")
     cache_hits = 0
     firebase_calls = 0
+    product_map = getattr(data_loader, "product_map", None) or _EMPTY
+    inventory_cache = getattr(data_loader, "inventory_map", None) or _EMPTY
     
+    # 1. CACHE FIRST - Product Info
+    products: Dict[str, Dict[str, Any]] = {}
+    product_misses: List[str] = []
     for sku in sku_list:
-        sku = str(sku).strip()
-        product_data = {'price': 0.0, 'pack_size': 1, 'weight': 15.0, 'height': 10.0, 'name': '', 'brand': ''}
-        
-        # 1. CACHE FIRST - Product Info
-        cache_hit = False
-        if sku in data_loader.product_map:
+        sku = norm_sku(sku)
+        if sku in products:
+            continue
+        if not sku:
+            # 빈 SKU 는 기본값만 두고 캐시/Firebase 조회 대상에서 제외 (get_all 청크 실패 방지)
+            products[sku] = dict(DEFAULT_PRODUCT_DATA)
+            continue
+        cached = product_map.get(sku)
+        if cached is not None:
             try:
-                cached = data_loader.product_map[sku]
-                product_data['price'] = float(cached.get('KeyAccountPrice_TJX', 0.0) or 0.0)
-                product_data['pack_size'] = safe_int(cached.get('UnitsPerCase', 1), 1)
-                product_data['weight'] = float(cached.get('MasterCarton_Weight_lbs', 15.0) or 15.0)
-                product_data['height'] = float(cached.get('MasterCarton_Height_inches', 10.0) or 10.0)
-                product_data['name'] = cached.get('ProductName_Short', '')
-                product_data['brand'] = cached.get('Brand', '')
-                cache_hit = True
+                products[sku] = _product_from_cache(cached)
                 cache_hits += 1
+                continue
             except Exception as e:
                 logger.warning(f"Failed to load cached product data for SKU {sku}: {e}")
-        
-        # Fallback to Firebase only if cache miss
-        if not cache_hit and db:
-            try:
-                firebase_calls += 1
-                prod_doc = db.collection('products').document(sku).get()
-                if prod_doc.exists:
-                    p = prod_doc.to_dict()
-                    product_data['price'] = safe_float(p.get('KeyAccountPrice_TJX', 0.0), 0.0)
-                    product_data['pack_size'] = safe_int(p.get('UnitsPerCase', 1), 1)
-                    product_data['weight'] = safe_float(p.get('MasterCarton_Weight_lbs', 15.0), 15.0)
-                    product_data['height'] = safe_float(p.get('MasterCarton_Height_inches', 10.0), 10.0)
-                    product_data['name'] = p.get('ProductName_Short', '')
-                    product_data['brand'] = p.get('Brand', '')
-            except Exception as e:
-                logger.warning(f"Failed to fetch product info from Firebase for SKU {sku}: {e}")
+        cached = _PRODUCT_CACHE.get(sku)
+        if cached is not None:
+            products[sku] = dict(cached)
+            cache_hits += 1
+            continue
+        products[sku] = dict(DEFAULT_PRODUCT_DATA)
+        product_misses.append(sku)
 
-        # 2. CACHE FIRST - Inventory Stock with Location Details
-        locations = {'MAIN': 0, 'SUB': 0}
-        total_stock = 0
-        
-        # Try cache first
-        if sku in data_loader.inventory_map:
+    # 2. CACHE FIRST - Inventory Stock with Location Details
+    stock: Dict[str, tuple] = {}
+    inventory_misses: List[str] = []
+    for sku in products:
+        if not sku:
+            continue
+        cached_inv = inventory_cache.get(sku)
+        if cached_inv is not None:
             try:
-                cached_inv = data_loader.inventory_map[sku]
-                main_qty = safe_int(cached_inv.get('MAIN', 0), 0)
-                sub_qty = safe_int(cached_inv.get('SUB', 0), 0)
-                locations['MAIN'] = main_qty
-                locations['SUB'] = sub_qty
-                total_stock = main_qty + sub_qty
+                # 로드 시점에 집계된 합계를 그대로 사용
+                stock[sku] = (dict(cached_inv['locations']), cached_inv['total'])
                 cache_hits += 1
+                if cached_inv['total'] != 0:
+                    continue
             except Exception as e:
                 logger.warning(f"Failed to load cached inventory for SKU {sku}: {e}")
-        
-        # Fallback to Firebase only if cache miss
-        if total_stock == 0 and db:
-            try:
-                firebase_calls += 1
-                docs = db.collection('inventory').where('sku', '==', sku).stream()
-                for doc in docs:
-                    doc_data = doc.to_dict()
-                    on_hand = safe_int(doc_data.get('onHand', 0), 0)
-                    # Parse location: WH_MAIN -> MAIN, WH_SUB -> SUB
-                    location_raw = str(doc_data.get('location', 'MAIN')).strip().upper()
-                    if 'SUB' in location_raw:
-                        location = 'SUB'
-                    elif 'MAIN' in location_raw:
-                        location = 'MAIN'
-                    else:
-                        location = location_raw
-                    
-                    if location not in locations:
-                        locations[location] = 0
-                    locations[location] += on_hand
-                    total_stock += on_hand
-            except Exception as e:
-                logger.warning(f"Failed to fetch inventory from Firebase for SKU {sku}: {e}")
+        inventory_misses.append(sku)
 
+    # Fallback to Firebase only for cache misses (products + inventory concurrently)
+    if db and (product_misses or inventory_misses):
+        firestore_stock: Dict[str, tuple] = {}
+        stock_misses: List[str] = []
+        for sku in inventory_misses:
+            cached = _STOCK_CACHE.get(sku)
+            if cached is not None:
+                firestore_stock[sku] = cached
+            else:
+                stock_misses.append(sku)
+
+        firebase_calls += bool(product_misses) + bool(stock_misses)
+        product_docs, inventory_docs = await asyncio.gather(
+            _fetch_products(product_misses),
+            _fetch_inventory(stock_misses),
+        )
+        for sku, prod_doc in product_docs.items():
+            products[sku] = _product_from_firestore(prod_doc.to_dict())
+            _PRODUCT_CACHE[sku] = products[sku]
+        if inventory_docs is not None:
+            # 조회에 실패한 청크의 SKU 는 결과에 없음 → 재고 0 으로 캐시하지 않음
+            for sku in stock_misses:
+                docs = inventory_docs.get(sku)
+                if docs is not None:
+                    firestore_stock[sku] = _STOCK_CACHE[sku] = _aggregate_stock(docs)
+
+        for sku, (location_totals, fs_total) in firestore_stock.items():
+            if not location_totals:
+                continue
+            locations, total_stock = stock.get(sku, ({'MAIN': 0, 'SUB': 0}, 0))
+            for location, on_hand in location_totals:
+                locations[location] = locations.get(location, 0) + on_hand
+            stock[sku] = (locations, total_stock + fs_total)
+
+    for sku, product_data in products.items():
+        locations, total_stock = stock.get(sku) or ({'MAIN': 0, 'SUB': 0}, 0)
         inventory_map[sku] = {
             'total': total_stock,
             'locations': locations,
@@ -217,7 +522,7 @@ async def download_review_worksheet(payload: Dict[str, Any] = Body(...)):
         # Generate filename
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         po_number = po_meta.get('po_number', 'Unknown')
-        safe_po = re.sub(r'[^\w\-]', '_', str(po_number))
+        safe_po = _SAFE_PO_RE.sub('_', str(po_number))
         filename = f"Review_Worksheet_{safe_po}_{timestamp}.csv"
         filepath = os.path.join(settings.OUTPUT_DIR, filename)
         
@@ -239,6 +544,7 @@ async def download_review_worksheet(payload: Dict[str, Any] = Body(...)):
 
 @router.post("/validate_po_pair")
 async def validate_po_pair(
+    background_tasks: BackgroundTasks,
     mother_file: UploadFile = File(...),
     dc_file: UploadFile = File(...)
 ):
@@ -261,25 +567,25 @@ async def validate_po_pair(
         
         mother_safe_name = _sanitize_filename(mother_file.filename)
         dc_safe_name = _sanitize_filename(dc_file.filename)
-        mother_temp_path = os.path.join(settings.TEMP_DIR, f"{uuid.uuid4()}_{mother_safe_name}")
-        dc_temp_path = os.path.join(settings.TEMP_DIR, f"{uuid.uuid4()}_{dc_safe_name}")
+        mother_temp_path = os.path.join(settings.UPLOAD_TMP_DIR, f"{uuid.uuid4()}_{mother_safe_name}")
+        dc_temp_path = os.path.join(settings.UPLOAD_TMP_DIR, f"{uuid.uuid4()}_{dc_safe_name}")
         
         # Save uploaded files
-        with open(mother_temp_path, "wb") as buffer:
-            shutil.copyfileobj(mother_file.file, buffer)
-        with open(dc_temp_path, "wb") as buffer:
-            shutil.copyfileobj(dc_file.file, buffer)
+        await asyncio.gather(
+            _save_upload(mother_file, mother_temp_path),
+            _save_upload(dc_file, dc_temp_path),
+        )
         
         logger.info(f"File upload completed: {time.time() - step_time:.2f}s")
         step_time = time.time()
         
-        # Parse Mother PO
-        mother_items, mother_error = parse_po(mother_temp_path)
+        # Parse Mother / DC PO concurrently on worker threads (CPU-bound PDF 파싱, 동일 파일은 캐시 재사용)
+        (mother_items, mother_error), (dc_items, dc_error) = await asyncio.gather(
+            _parse_po_cached(mother_temp_path),
+            _parse_po_cached(dc_temp_path),
+        )
         if mother_error:
             raise HTTPException(400, f"Failed to parse Mother PO: {mother_error}")
-        
-        # Parse DC PO
-        dc_items, dc_error = parse_po(dc_temp_path)
         if dc_error:
             raise HTTPException(400, f"Failed to parse DC PO: {dc_error}")
         
@@ -311,110 +617,96 @@ async def validate_po_pair(
             dc_po_numbers = list({str(item.get('po_number', '')).strip() for item in dc_items if item.get('po_number')})
 
         
-        # Build Mother PO totals by SKU
-        mother_totals = {}
-        mother_unit_costs = {}  # Track unit cost from Mother PO
-        for item in mother_items:
-            sku = str(item.get('sku', '')).strip()
-            qty = safe_int(item.get('po_qty', 0), 0)
-            unit_cost_from_po = safe_float(item.get('unit_cost', 0.0), 0.0)
-            mother_totals[sku] = mother_totals.get(sku, 0) + qty
-            # Store unit cost from PO (if available and > 0)
-            if unit_cost_from_po > 0 and sku not in mother_unit_costs:
-                mother_unit_costs[sku] = unit_cost_from_po
-        
-        # Build DC PO totals by SKU
-        dc_totals = {}
-        dc_breakdown = {}
-        for item in dc_items:
-            sku = str(item.get('sku', '')).strip()
-            dc_id = str(item.get('dc_id', '')).strip()
-            qty = safe_int(item.get('po_qty', 0), 0)
-            
-            dc_totals[sku] = dc_totals.get(sku, 0) + qty
-            
-            if sku not in dc_breakdown:
-                dc_breakdown[sku] = []
-            dc_breakdown[sku].append({'dc_id': dc_id, 'qty': qty})
-        
-        # Compare and find mismatches
+        # Build Mother / DC PO totals by SKU (groupby, 최초 등장 순서 유지)
+        mother_df = pd.DataFrame({
+            'sku': [norm_sku(item.get('sku', '')) for item in mother_items],
+            'qty': [safe_int(item.get('po_qty', 0), 0) for item in mother_items],
+            'unit_cost': [safe_float(item.get('unit_cost', 0.0), 0.0) for item in mother_items],
+        })
+        mother_qty_by_sku = mother_df.groupby('sku', sort=False)['qty'].sum()
+        # Track unit cost from Mother PO (first value > 0 per SKU)
+        priced = mother_df[mother_df['unit_cost'] > 0].drop_duplicates('sku')
+        mother_unit_costs = dict(zip(priced['sku'].tolist(), priced['unit_cost'].tolist()))
+
+        dc_skus = [norm_sku(item.get('sku', '')) for item in dc_items]
+        dc_ids = [str(item.get('dc_id', '')).strip() for item in dc_items]
+        dc_qtys = [safe_int(item.get('po_qty', 0), 0) for item in dc_items]
+        dc_qty_by_sku = pd.Series(dc_qtys, index=dc_skus, dtype='int64').groupby(level=0, sort=False).sum()
+        dc_breakdown: Dict[str, List[Dict[str, Any]]] = {}
+        # DC PO 의 실제 Pack Size (SKU 별 첫 번째 1 초과 값) 도 같은 패스에서 수집
+        dc_pack_sizes: Dict[str, int] = {}
+        # DC 별 행 인덱스 (팔레트 계산 시 DC 마다 dc_items 전체를 다시 훑지 않도록)
+        dc_row_indices: Dict[str, List[int]] = {}
+        for i, (item, sku, dc_id, qty) in enumerate(zip(dc_items, dc_skus, dc_ids, dc_qtys)):
+            dc_breakdown.setdefault(sku, []).append({'dc_id': dc_id, 'qty': qty})
+            dc_row_indices.setdefault(dc_id, []).append(i)
+            if sku not in dc_pack_sizes:
+                item_pack = safe_int(item.get('pack_size', 0), 0)
+                if item_pack > 1:
+                    dc_pack_sizes[sku] = item_pack
+
+        # Compare and find mismatches (Mother SKU 순서 -> DC 전용 SKU 순서)
+        sku_order = mother_qty_by_sku.index.append(dc_qty_by_sku.index.difference(mother_qty_by_sku.index, sort=False))
+        compare = pd.DataFrame({'mother': mother_qty_by_sku, 'dc': dc_qty_by_sku}).reindex(sku_order)
+        in_mother = compare['mother'].notna()
+        compare = compare.fillna(0).astype('int64')
+        difference = compare['dc'] - compare['mother']
+
+        matching_count = int(((difference == 0) & in_mother).sum())
+        over_allocated = int(((difference > 0) & in_mother).sum())
+        under_allocated = int(((difference < 0) & in_mother).sum())
+        extra_skus = int((~in_mother).sum())
+
+        mismatch_mask = (difference != 0) | ~in_mother
         mismatches = []
-        matching_count = 0
-        over_allocated = 0
-        under_allocated = 0
-        extra_skus = 0
-        
-        for sku, mother_qty in mother_totals.items():
-            dc_qty = dc_totals.get(sku, 0)
-            
-            if dc_qty != mother_qty:
-                status = 'over' if dc_qty > mother_qty else 'under'
-                if status == 'over':
-                    over_allocated += 1
-                else:
-                    under_allocated += 1
-                    
-                mismatches.append({
-                    'sku': sku,
-                    'mother_qty': mother_qty,
-                    'dc_total': dc_qty,
-                    'difference': dc_qty - mother_qty,
-                    'dc_breakdown': dc_breakdown.get(sku, []),
-                    'status': status
-                })
-            else:
-                matching_count += 1
-        
-        # Check for SKUs in DC PO but not in Mother PO
-        for sku in dc_totals:
-            if sku not in mother_totals:
-                extra_skus += 1
-                mismatches.append({
-                    'sku': sku,
-                    'mother_qty': 0,
-                    'dc_total': dc_totals[sku],
-                    'difference': dc_totals[sku],
-                    'dc_breakdown': dc_breakdown.get(sku, []),
-                    'status': 'extra'
-                })
+        for sku, mother_qty, dc_qty, diff, from_mother in zip(
+            compare.index[mismatch_mask].tolist(),
+            compare['mother'][mismatch_mask].tolist(),
+            compare['dc'][mismatch_mask].tolist(),
+            difference[mismatch_mask].tolist(),
+            in_mother[mismatch_mask].tolist(),
+        ):
+            mismatches.append({
+                'sku': sku,
+                'mother_qty': mother_qty,
+                'dc_total': dc_qty,
+                'difference': diff,
+                'dc_breakdown': dc_breakdown.get(sku, []),
+                'status': ('over' if diff > 0 else 'under') if from_mother else 'extra'
+            })
         
-        # Get all unique SKUs for inventory validation
-        all_skus = list(set(list(mother_totals.keys()) + list(dc_totals.keys())))
+        # Get all unique SKUs for inventory validation (Mother 순서 -> DC 전용, 비교 단계의 순서 재사용)
+        all_skus = sku_order.tolist()
         
         logger.info(f"PO comparison completed: {time.time() - step_time:.2f}s")
         step_time = time.time()
         
         # Fetch inventory data
-        inv_map = get_inventory_data(all_skus)
+        inv_map = await get_inventory_data(all_skus)
         
         logger.info(f"Inventory data fetch: {time.time() - step_time:.2f}s")
         step_time = time.time()
         
-        # Convert to validator format
-        validator_inv_map = {}
-        validator_prod_map = {}
-        for sku, data in inv_map.items():
-            validator_inv_map[sku] = {
-                'total': data.get('total', 0),
-                'locations': data.get('locations', {'MAIN': 0, 'SUB': 0})
-            }
-            validator_prod_map[sku] = {
-                'KeyAccountPrice_TJX': data.get('price', 0.0)
-            }
+        # Convert to validator format (inv_map 항목은 이미 total/locations 를 가짐)
+        validator_prod_map = _validator_product_map(inv_map)
         
         # Validate inventory for Mother PO items
-        validated_mother = validate_po_data(
+        validated_mother = await run_in_threadpool(
+            validate_po_data,
             mother_items,
-            inventory_map=validator_inv_map,
+            inventory_map=inv_map,
             product_map=validator_prod_map,
             safety_stock_value=resolve_safety_stock(None),
             stock_mode="TOTAL"
         )
         
-        # Build inventory warnings
+        # Build inventory warnings and per-SKU shortage totals in one pass
         inventory_warnings = []
+        shortage_map: Dict[str, int] = {}
         for item in validated_mother:
             shortage = safe_int(item.get('remaining_shortage', 0), 0)
+            sku_key = norm_sku(item.get('sku', ''))
+            shortage_map[sku_key] = shortage_map.get(sku_key, 0) + shortage
             if shortage > 0:
                 inventory_warnings.append({
                     'sku': item.get('sku'),
@@ -424,13 +716,16 @@ async def validate_po_pair(
                     'status': item.get('inventory_status', 'OK')
                 })
 
-        shortage_map: Dict[str, int] = {}
-        for item in validated_mother:
-            sku_key = str(item.get('sku', '')).strip()
-            shortage_map[sku_key] = shortage_map.get(sku_key, 0) + safe_int(item.get('remaining_shortage', 0), 0)
-
+        inv_map = _with_default_inv(inv_map)
+        product_map = getattr(data_loader, "product_map", None) or _EMPTY
         sku_details: List[Dict[str, Any]] = []
-        by_dc_totals_map: Dict[str, Dict[str, Any]] = {}
+        # DC 별 합계 dict 를 미리 만들어 두고 루프에서는 무조건 누적만 수행 (DC PO 등장 순서 유지)
+        by_dc_totals_map: Dict[str, Dict[str, Any]] = {
+            dc_id: {'dc_id': dc_id, 'units': 0, 'cartons': 0, 'sku_count': 0, 'sku_preview': [], 'last_sku': None}
+            for dc_id in dict.fromkeys(
+                entry['dc_id'] for entries in dc_breakdown.values() for entry in entries
+            )
+        }
         totals = {
             'total_skus': len(all_skus),
             'total_units_mother': 0,
@@ -439,86 +734,79 @@ async def validate_po_pair(
             'total_cartons_dc': 0
         }
 
-        for sku in all_skus:
-            mother_qty = safe_int(mother_totals.get(sku, 0), 0)
-            dc_qty = safe_int(dc_totals.get(sku, 0), 0)
-            inv = inv_map.get(sku, {})
-            
-            # Get pack size from DC items first (more accurate), then fallback to product map
-            pack_size = 1
-            # Try to get pack_size from DC items (they have actual pack size from PDF table)
-            for item in dc_items:
-                if str(item.get('sku', '')).strip() == sku:
-                    item_pack = safe_int(item.get('pack_size', 0), 0)
-                    if item_pack > 1:
-                        pack_size = item_pack
-                        break
-            
-            # Fallback to product map if not found in DC items
-            product_map = getattr(data_loader, "product_map", {})
-            product_info = product_map.get(sku, {})
-            if pack_size == 1:
-                pack_size = safe_int(product_info.get('UnitsPerCase', product_info.get('CasePack', 1)), 1)
-                if pack_size <= 0:
-                    pack_size = 1
+        # Pack size per SKU: DC items first (actual pack size from PDF table), then product map
+        pack_size_map = {
+            sku: dc_pack_sizes.get(sku) or _product_pack_size(product_map.get(sku, _EMPTY))
+            for sku in all_skus
+        }
+
+        # compare 는 all_skus 와 같은 순서의 int64 합계 (Mother/DC 에 없으면 0)
+        # 카톤 수/상태/합계는 배열 연산으로 한 번에 계산하고, 루프는 행 dict 조립만 담당
+        mother_arr = compare['mother'].to_numpy()
+        dc_arr = compare['dc'].to_numpy()
+        pack_arr = np.fromiter((pack_size_map[sku] for sku in all_skus), dtype=np.int64, count=len(all_skus))
+        mother_cartons_arr = np.where(mother_arr > 0, -(-mother_arr // pack_arr), 0)
+        dc_cartons_arr = np.where(dc_arr > 0, -(-dc_arr // pack_arr), 0)
+        status_arr = np.select(
+            [(mother_arr == 0) & (dc_arr > 0), dc_arr > mother_arr, dc_arr < mother_arr],
+            ['extra', 'over', 'under'], default='ok'
+        )
+        totals['total_units_mother'] = int(mother_arr.sum())
+        totals['total_units_dc'] = int(dc_arr.sum())
+        totals['total_cartons_mother'] = int(mother_cartons_arr.sum())
+        totals['total_cartons_dc'] = int(dc_cartons_arr.sum())
+
+        for sku, mother_qty, dc_qty, pack_size, mother_cartons, dc_cartons, status, sku_difference in zip(
+            all_skus, mother_arr.tolist(), dc_arr.tolist(), pack_arr.tolist(),
+            mother_cartons_arr.tolist(), dc_cartons_arr.tolist(), status_arr.tolist(), difference.tolist()
+        ):
+            inv = inv_map[sku]
             
             # Get unit price - try multiple sources
-            unit_price = safe_float(inv.get('price', 0.0), 0.0)
-            if unit_price == 0 and product_info:
+            unit_price = safe_float(inv['price'], 0.0)
+            if unit_price == 0:
                 # Fallback to product_map if inv doesn't have price
-                unit_price = safe_float(product_info.get('KeyAccountPrice_TJX', 0.0), 0.0)
+                product_info = product_map.get(sku)
+                if product_info:
+                    unit_price = safe_float(product_info.get('KeyAccountPrice_TJX', 0.0), 0.0)
             
             logger.debug(f"SKU {sku}: price={unit_price}, pack={pack_size}")
 
-            mother_cartons = math.ceil(mother_qty / pack_size) if mother_qty > 0 else 0
-            dc_cartons = math.ceil(dc_qty / pack_size) if dc_qty > 0 else 0
-
-            difference = dc_qty - mother_qty
-            if mother_qty == 0 and dc_qty > 0:
-                status = 'extra'
-            elif dc_qty > mother_qty:
-                status = 'over'
-            elif dc_qty < mother_qty:
-                status = 'under'
-            else:
-                status = 'ok'
-
             breakdown_list = []
-            for dc_entry in dc_breakdown.get(sku, []):
-                dc_id_val = str(dc_entry.get('dc_id', '')).strip()
-                dc_qty_val = safe_int(dc_entry.get('qty', 0), 0)
-                cartons_val = math.ceil(dc_qty_val / pack_size) if dc_qty_val > 0 else 0
+            for dc_entry in dc_breakdown.get(sku, ()):
+                # dc_breakdown 항목은 위에서 이미 정규화된 (str, int) 값
+                dc_id_val = dc_entry['dc_id']
+                dc_qty_val = dc_entry['qty']
+                cartons_val = -(-dc_qty_val // pack_size) if dc_qty_val > 0 else 0
                 breakdown_list.append({
                     'dc_id': dc_id_val,
                     'qty': dc_qty_val,
                     'cartons': cartons_val
                 })
 
-                if dc_id_val not in by_dc_totals_map:
-                    by_dc_totals_map[dc_id_val] = {
-                        'dc_id': dc_id_val,
-                        'units': 0,
-                        'cartons': 0,
-                        'skus': set()
-                    }
                 dc_totals_obj = by_dc_totals_map[dc_id_val]
                 dc_totals_obj['units'] += dc_qty_val
                 dc_totals_obj['cartons'] += cartons_val
-                dc_totals_obj['skus'].add(sku)
+                # 같은 SKU 의 DC 행은 한 반복 안에서 연속 처리되므로 직전 SKU 비교만으로 중복 제거
+                if dc_totals_obj['last_sku'] != sku:
+                    dc_totals_obj['last_sku'] = sku
+                    dc_totals_obj['sku_count'] += 1
+                    # 사전순 최소 SKU_PREVIEW_LIMIT 개만 정렬 상태로 유지
+                    preview = dc_totals_obj['sku_preview']
+                    if len(preview) < SKU_PREVIEW_LIMIT:
+                        insort(preview, sku)
+                    elif sku < preview[-1]:
+                        preview.pop()
+                        insort(preview, sku)
 
-            totals['total_units_mother'] += mother_qty
-            totals['total_units_dc'] += dc_qty
-            totals['total_cartons_mother'] += mother_cartons
-            totals['total_cartons_dc'] += dc_cartons
-            
-            locations = inv.get('locations', {})
+            locations = inv['locations']
             available_main = safe_int(locations.get('MAIN', 0), 0)
             available_sub = safe_int(locations.get('SUB', 0), 0)
-            available_total = safe_int(inv.get('total', 0), 0)
+            available_total = safe_int(inv['total'], 0)
             shortage_total = safe_int(shortage_map.get(sku, 0), 0)
             shortage_main = max(0, mother_qty - available_main)
             shortage_sub = max(0, mother_qty - available_sub)
-            is_unregistered_sku = _is_unregistered_sku(inv, sku)
+            is_unregistered_sku = _is_unregistered_sku(inv, sku, product_map)
             
             # Compare PO price vs System price
             po_unit_price = mother_unit_costs.get(sku, 0.0)
@@ -531,8 +819,8 @@ async def validate_po_pair(
 
             sku_details.append({
                 'sku': sku,
-                'name': inv.get('name', ''),
-                'brand': inv.get('brand', ''),
+                'name': inv['name'],
+                'brand': inv['brand'],
                 'pack_size': pack_size,
                 'unit_price': unit_price,
                 'po_unit_price': po_unit_price,
@@ -542,7 +830,7 @@ async def validate_po_pair(
                 'mother_cartons': mother_cartons,
                 'dc_total_qty': dc_qty,
                 'dc_total_cartons': dc_cartons,
-                'difference': difference,
+                'difference': sku_difference,
                 'status': status,
                 'dc_breakdown': breakdown_list,
                 'inventory': {
@@ -561,46 +849,41 @@ async def validate_po_pair(
             })
 
         by_dc_totals: List[Dict[str, Any]] = []
-        palletizer = Palletizer()
-        
+        palletizer = PALLETIZER
+
+        # 팔레트 입력 속성은 전체 DC 행에 대해 한 번만 계산하고, DC 별로는 행 인덱스로 잘라서 사용
+        n_dc_rows = len(dc_items)
+        dc_row_invs = [inv_map[sku] for sku in dc_skus]
+        dc_row_qty = np.fromiter(dc_qtys, dtype=np.int64, count=n_dc_rows)
+        dc_row_pack = np.maximum(
+            np.fromiter((safe_int(item.get('pack_size', 1), 1) for item in dc_items), dtype=np.int64, count=n_dc_rows), 1
+        )
+        dc_row_cases = np.where(dc_row_qty > 0, -(-dc_row_qty // dc_row_pack), 0)
+        dc_row_weight = np.fromiter((inv['weight'] for inv in dc_row_invs), dtype=np.float64, count=n_dc_rows)
+        dc_row_height = np.fromiter((inv['height'] for inv in dc_row_invs), dtype=np.float64, count=n_dc_rows)
+        # Get Max CT from product map (Max_Cartons_per_Pallet, SKU 당 1회 조회); 0 이하는 Palletizer 에서 20 으로 처리
+        max_ct_by_sku = {
+            sku: safe_int(product_map.get(sku, _EMPTY).get('Max_Cartons_per_Pallet', 20), 20)
+            for sku in dict.fromkeys(dc_skus)
+        }
+        dc_row_max_ct = np.fromiter((max_ct_by_sku[sku] for sku in dc_skus), dtype=np.int64, count=n_dc_rows)
+
         for dc_id, totals_obj in by_dc_totals_map.items():
-            sku_preview = heapq.nsmallest(SKU_PREVIEW_LIMIT, totals_obj['skus'])
-            
-            # Calculate pallets for this DC
-            dc_pallet_items = []
-            for item in dc_items:
-                if str(item.get('dc_id', '')).strip() == dc_id:
-                    sku = str(item.get('sku', '')).strip()
-                    qty = safe_int(item.get('po_qty', 0), 0)
-                    inv = inv_map.get(sku, {})
-                    
-                    # Get pack size
-                    pack_size = safe_int(item.get('pack_size', 1), 1)
-                    if pack_size < 1:
-                        pack_size = 1
-                    
-                    # Get Max CT from product map (Max_Cartons_per_Pallet)
-                    product_info = data_loader.product_map.get(sku, {})
-                    max_ct = safe_int(product_info.get('Max_Cartons_per_Pallet', 20), 20)
-                    if max_ct <= 0:
-                        max_ct = 20
-                    
-                    dc_pallet_items.append({
-                        'sku': sku,
-                        'description': inv.get('name', ''),
-                        'po_qty': qty,
-                        'pack_size': pack_size,
-                        'case_qty': math.ceil(qty / pack_size) if qty > 0 else 0,
-                        'weight_lbs': inv.get('weight', 15.0),
-                        'height_inches': inv.get('height', 10.0),
-                        'max_cartons_per_pallet': max_ct
-                    })
-            
-            # Calculate pallets
+            # Calculate pallets for this DC (품목 속성을 배열로 모아 Palletizer 에 전달)
+            row_indices = dc_row_indices.get(dc_id, ())
             dc_pallets = []
-            if dc_pallet_items:
+            if row_indices:
                 try:
-                    dc_pallets = palletizer.calculate_pallets(dc_pallet_items)
+                    idx = np.array(row_indices, dtype=np.intp)
+                    dc_pallets = palletizer.calculate_pallets_arrays(
+                        skus=[dc_skus[i] for i in row_indices],
+                        case_qty=dc_row_cases[idx],
+                        pack_size=dc_row_pack[idx],
+                        weight_lbs=dc_row_weight[idx],
+                        height_inches=dc_row_height[idx],
+                        max_ct=dc_row_max_ct[idx],
+                        descriptions=[dc_row_invs[i]['name'] for i in row_indices],
+                    )
                     logger.info(f"DC #{dc_id}: Generated {len(dc_pallets)} pallets")
                 except Exception as e:
                     logger.error(f"Failed to calculate pallets for DC #{dc_id}: {e}")
@@ -609,8 +892,8 @@ async def validate_po_pair(
                 'dc_id': dc_id,
                 'units': totals_obj['units'],
                 'cartons': totals_obj['cartons'],
-                'skus': len(totals_obj['skus']),
-                'sku_preview': sku_preview,
+                'skus': totals_obj['sku_count'],
+                'sku_preview': totals_obj['sku_preview'],
                 'pallets': dc_pallets
             })
         
@@ -674,29 +957,25 @@ async def validate_po_pair(
         validation_result = sanitize_for_json(validation_result)
         review_record = sanitize_for_json(review_record)
         
-        # Save review to outputs/po_reviews/
+        # Save review to outputs/po_reviews/ (응답 전송 후 워커 스레드에서 기록)
         reviews_dir = os.path.join(settings.OUTPUT_DIR, "po_reviews")
-        os.makedirs(reviews_dir, exist_ok=True)
         # Sanitize PO numbers for use in filename
-        safe_mother_po = re.sub(r'[^\w\-]', '_', str(mother_po_number))
-        safe_dc_po = re.sub(r'[^\w\-]', '_', str(dc_po_number))
+        safe_mother_po = _SAFE_PO_RE.sub('_', str(mother_po_number))
+        safe_dc_po = _SAFE_PO_RE.sub('_', str(dc_po_number))
         review_filename = f"{timestamp.replace(':', '-')}_{safe_mother_po}_vs_{safe_dc_po}.json"
         review_path = os.path.join(reviews_dir, review_filename)
         
-        with open(review_path, 'w', encoding='utf-8') as f:
-            json.dump(review_record, f, indent=2)
+        background_tasks.add_task(_write_review, review_path, review_record)
         
-        # Final sanitization before JSON response
-        response_data = sanitize_for_json({
+        # validation_result 는 위에서 이미 sanitize 됨 (중복 재귀 순회 생략)
+        response_data = {
             "status": "success",
             "validation": validation_result
-        })
+        }
         
-        # JSON serialization with sanitization
+        # JSON serialization (orjson)
         try:
-            response_data = sanitize_for_json(response_data)
-            json_str = json.dumps(response_data, ensure_ascii=False, allow_nan=False)
-            return Response(content=json_str, media_type="application/json")
+            return ORJSONResponse(response_data)
         except (ValueError, TypeError) as e:
             logger.error(f"JSON 직렬화 오류: {e}")
             raise HTTPException(500, f"데이터 변환 중 오류가 발생했습니다: {str(e)}")
@@ -707,40 +986,41 @@ async def validate_po_pair(
         logger.error(f"PO 검증 오류: {e}", exc_info=True)
         raise HTTPException(500, f"검증 처리 중 오류가 발생했습니다: {str(e)}")
     finally:
-        # Clean up temp files
-        if mother_temp_path and os.path.exists(mother_temp_path):
-            try:
-                os.remove(mother_temp_path)
-            except Exception as e:
-                logger.warning(f"Failed to delete temp file {mother_temp_path}: {e}")
-        if dc_temp_path and os.path.exists(dc_temp_path):
+        # Clean up temp files (존재 여부 확인 없이 바로 삭제 시도)
+        for temp_path in (mother_temp_path, dc_temp_path):
+            if not temp_path:
+                continue
             try:
-                os.remove(dc_temp_path)
-            except Exception as e:
-                logger.warning(f"Failed to delete temp file {dc_temp_path}: {e}")
+                os.remove(temp_path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Failed to delete temp file {temp_path}: {e}")
 
 
 @router.post("/analyze_po")
 async def analyze_po(
     file: UploadFile = File(...),
     stock_mode: str = "TOTAL",
-    safety_stock_value: Optional[int] = None
+    safety_stock_value: Optional[int] = None,
+    include_raw: bool = False
 ):
     """
     Analyze PO PDF file using new dynamic parser and validator.
     Returns validated items with MAIN/SUB inventory status.
+    Per-row analysis (raw_data) is only included when include_raw=true;
+    otherwise the worksheet URL and raw_count are returned.
     """
     try:
         file_path = os.path.join(settings.TEMP_DIR, file.filename)
-        with open(file_path, "wb") as buffer: 
-            shutil.copyfileobj(file.file, buffer)
+        await _save_upload(file, file_path)
         
         # Use the new parser that returns List[Dict]
-        parsed_items, po_num, ship_window = parse_po_to_order_data(file_path)
+        parsed_items, po_num, ship_window = await run_in_threadpool(parse_po_to_order_data, file_path)
         
         # Check for parsing errors
         if not parsed_items:
-            return JSONResponse({
+            return ORJSONResponse({
                 "status": "error",
                 "message": "No valid data found in PO PDF",
                 "po_number": po_num,
@@ -750,34 +1030,23 @@ async def analyze_po(
         # Extract buyer from first parsed item
         buyer = parsed_items[0].get('buyer', 'UNKNOWN') if parsed_items else 'UNKNOWN'
         
-        # Extract all SKUs for inventory lookup
-        all_skus = list(set(str(item.get('sku', '')).strip() for item in parsed_items))
+        # Extract all SKUs for inventory lookup (dict 키로 순서 유지 중복 제거, 리스트 복사 없이 전달)
+        all_skus = dict.fromkeys(norm_sku(item.get('sku', '')) for item in parsed_items)
         
         # Fetch inventory data with MAIN/SUB split
-        inv_map = get_inventory_data(all_skus)
-        
-        # Convert inv_map to format expected by validator
-        validator_inv_map = {}
-        for sku, data in inv_map.items():
-            validator_inv_map[sku] = {
-                'total': data.get('total', 0),
-                'locations': data.get('locations', {'MAIN': 0, 'SUB': 0})
-            }
-        
-        # Build product_map for validator
-        validator_prod_map = {}
-        for sku, data in inv_map.items():
-            validator_prod_map[sku] = {
-                'KeyAccountPrice_TJX': data.get('price', 0.0)
-            }
+        inv_map = await get_inventory_data(all_skus)
+        
+        # Build product_map for validator (inv_map 항목은 이미 total/locations 를 가짐)
+        validator_prod_map = _validator_product_map(inv_map)
         
         # Determine safety stock (configurable, defaults to settings)
         effective_safety_stock = resolve_safety_stock(safety_stock_value)
 
         # Validate PO data using the new validator
-        validated_items = validate_po_data(
+        validated_items = await run_in_threadpool(
+            validate_po_data,
             parsed_items,
-            inventory_map=validator_inv_map,
+            inventory_map=inv_map,
             product_map=validator_prod_map,
             safety_stock_value=effective_safety_stock,
             stock_mode=stock_mode
@@ -786,8 +1055,7 @@ async def analyze_po(
         # Get validation summary
         validation_summary = get_validation_summary(validated_items)
         
-        # Build analysis result for frontend/Excel (backward compatible format)
-        analysis_result = []
+        # Build analysis summary (per-row analysis is in df_items below)
         summary = {
             'total_skus': len(all_skus),
             'total_units': 0,
@@ -800,83 +1068,82 @@ async def analyze_po(
             'dcs': {}
         }
         
-        for item in validated_items:
-            sku = str(item.get('sku', '')).strip()
-            dc_id = str(item.get('dc_id', '')) or 'N/A'
-            po_qty = safe_int(item.get('po_qty', 0), 0)
-            pack_size = safe_int(item.get('pack_size', 1), 1)
-            if pack_size < 1:
-                pack_size = 1
-            
-            # Get price from inventory map
-            inv = inv_map.get(sku, {'price': 0.0, 'pack_size': 1})
-            price = safe_float(inv.get('price', 0.0), 0.0)
-            case_qty = math.ceil(po_qty / pack_size)
-            total_price = po_qty * price
-            
-            # Get inventory details
-            main_stock = _get_stock_value(item, 'available_main_stock')
-            sub_stock = _get_stock_value(item, 'available_sub_stock')
-            total_stock = _get_stock_value(item, 'available_total_stock')
-            remaining_shortage = safe_int(item.get('remaining_shortage', 0), 0)
-            
-            analysis_result.append({
-                'DC #': dc_id,
-                'SKU': sku,
-                'Description': str(item.get('description', '')),
-                'PO Qty (Units)': po_qty,
-                'Pack Size': pack_size,
-                'Main Stock': main_stock,
-                'Sub Stock': sub_stock,
-                'Total Stock': total_stock,
-                'Shortage': remaining_shortage,
-                'Status': item.get('status', 'OK'),
-                'Status Label': item.get('status_label', item.get('status', '')),
-                'PO Price': price,
-                'Unit Cost': safe_float(item.get('unit_cost', 0.0), 0.0),
-                'Total Amount': total_price,
-                'Final Qty (Units)': po_qty,
-                'Sales Order #': item.get('sales_order_num', ''),
-                'Price Warning': item.get('price_warning', ''),
-            })
-            
-            # Summary Logic
-            summary['total_units'] += po_qty
-            summary['total_cartons'] += case_qty
-            summary['total_amount'] += total_price
-            
-            if dc_id not in summary['dcs']:
+        # 행 단위 스칼라 연산 대신 컬럼 배열로 한 번에 계산
+        n_items = len(validated_items)
+        skus = [norm_sku(item.get('sku', '')) for item in validated_items]
+        po_qty = np.fromiter((safe_int(item.get('po_qty', 0), 0) for item in validated_items), dtype=np.int64, count=n_items)
+        pack_size = np.maximum(
+            np.fromiter((safe_int(item.get('pack_size', 1), 1) for item in validated_items), dtype=np.int64, count=n_items), 1
+        )
+        # Get price from inventory map
+        inv_map = _with_default_inv(inv_map)
+        price = np.fromiter(
+            (safe_float(inv_map[sku]['price'], 0.0) for sku in skus), dtype=np.float64, count=n_items
+        )
+        # validate_po_data 가 항상 채우는 필드는 itemgetter 로 바로 추출 (int/str 보장)
+        remaining_shortage = np.fromiter(map(_get_remaining_shortage, validated_items), dtype=np.int64, count=n_items)
+        case_qty = -(-po_qty // pack_size)
+        total_price = po_qty * price
+
+        df_items = pd.DataFrame({
+            'DC #': [str(item.get('dc_id', '')) or 'N/A' for item in validated_items],
+            'SKU': skus,
+            'Description': [str(item.get('description', '')) for item in validated_items],
+            'PO Qty (Units)': po_qty,
+            'Pack Size': pack_size,
+            'Main Stock': list(map(_get_available_main, validated_items)),
+            'Sub Stock': list(map(_get_available_sub, validated_items)),
+            'Total Stock': list(map(_get_available_total, validated_items)),
+            'Shortage': remaining_shortage,
+            'Status': list(map(_get_status, validated_items)),
+            'Status Label': list(map(_get_status_label, validated_items)),
+            'PO Price': price,
+            'Unit Cost': [safe_float(item.get('unit_cost', 0.0), 0.0) for item in validated_items],
+            'Total Amount': total_price,
+            'Final Qty (Units)': po_qty,
+            'Sales Order #': [item.get('sales_order_num', '') for item in validated_items],
+            'Price Warning': list(map(_get_price_warning, validated_items)),
+        })
+
+        # Summary Logic
+        summary['total_units'] = int(po_qty.sum())
+        summary['total_cartons'] = int(case_qty.sum())
+        summary['total_amount'] = float(total_price.sum())
+        summary['shortage_skus_count'] = int((remaining_shortage > 0).sum())
+
+        if n_items:
+            dc_group = df_items.assign(case_qty=case_qty).groupby('DC #', sort=False).agg(
+                units=('PO Qty (Units)', 'sum'),
+                cartons=('case_qty', 'sum'),
+                amount=('Total Amount', 'sum'),
+            )
+            shortage_rows = df_items.loc[remaining_shortage > 0, ['DC #', 'SKU', 'Shortage']]
+            shortage_by_dc: Dict[str, List[Dict[str, Any]]] = {}
+            for dc_id, sku, short in shortage_rows.itertuples(index=False, name=None):
+                shortage_by_dc.setdefault(dc_id, []).append({'sku': sku, 'short': int(short)})
+            for dc_id, units, cartons, amount in dc_group.itertuples(name=None):
                 summary['dcs'][dc_id] = {
-                    'units': 0,
-                    'cartons': 0,
-                    'amount': 0.0,
-                    'shortage_items': []
+                    'units': int(units),
+                    'cartons': int(cartons),
+                    'amount': float(amount),
+                    'shortage_items': shortage_by_dc.get(dc_id, [])
                 }
-            
-            dc_sum = summary['dcs'][dc_id]
-            dc_sum['units'] += po_qty
-            dc_sum['cartons'] += case_qty
-            dc_sum['amount'] += total_price
-            
-            if remaining_shortage > 0:
-                summary['shortage_skus_count'] += 1
-                dc_sum['shortage_items'].append({
-                    'sku': sku,
-                    'short': remaining_shortage
-                })
         
-        doc_gen = DocumentGenerator(settings.OUTPUT_DIR)
-        worksheet_url = doc_gen.generate_review_worksheet(validated_items)
+        doc_gen = DOC_GEN
+        worksheet_url = await run_in_threadpool(doc_gen.generate_review_worksheet, validated_items)
         
-        return JSONResponse({
+        response = {
             "status": "success",
             "summary": summary,
             "po_number": po_num,
             "ship_window": ship_window,
             "buyer": buyer,
             "worksheet_url": worksheet_url,
-            "raw_data": analysis_result
-        })
+            "raw_count": n_items
+        }
+        if include_raw:
+            response["raw_data"] = df_items.to_dict('records')
+        return ORJSONResponse(response)
     except Exception as e:
         logger.error(f"Error analyzing PO: {e}")
         raise HTTPException(500, str(e))
@@ -891,44 +1158,63 @@ async def calculate_pallets(payload: Dict[str, Any] = Body(...)):
         
         data_rows = []
         if source_type == 'excel':
-            file_path = os.path.join(settings.TEMP_DIR, payload.get('filename'))
-            data_rows = pd.read_excel(file_path).to_dict('records')
+            filename = str(payload.get('filename') or '')
+            if not _UPLOAD_EXCEL_NAME_RE.fullmatch(filename):
+                raise HTTPException(400, "Invalid filename")
+            file_path = os.path.join(settings.UPLOAD_TMP_DIR, filename)
+            data_rows = await run_in_threadpool(_load_excel_rows, file_path)
         else:
             data_rows = payload.get('data', [])
 
         # Re-fetch inventory for weights
-        skus = list(set(str(r.get('SKU', '')) for r in data_rows))
-        inv_map = get_inventory_data(skus)
+        row_skus = [norm_sku(r.get('SKU', '')) for r in data_rows]
+        inv_map = _with_default_inv(await get_inventory_data(dict.fromkeys(row_skus)))
         
+        # 수량/팩 사이즈/카톤 수는 배열로 한 번에 계산
+        n_rows = len(data_rows)
+        final_qty = np.fromiter(
+            (safe_int(row.get('Final Qty (Units)', row.get('Final Qty', 0)), 0) for row in data_rows), dtype=np.int64, count=n_rows
+        )
+        pack_size = np.maximum(
+            np.fromiter(
+                (safe_int(row.get('Pack Size', inv_map[sku]['pack_size']), 1) for sku, row in zip(row_skus, data_rows)),
+                dtype=np.int64, count=n_rows
+            ), 1
+        )
+        cases = -(-final_qty // pack_size)
+
+        # 수량 > 0 인 행만 골라 배열을 한 번에 파이썬 int 리스트로 변환 (행별 numpy 스칼라 변환 없음)
+        keep = np.flatnonzero(final_qty > 0)
         pallet_input = []
-        for row in data_rows:
-            sku = str(row.get('SKU', ''))
-            final_qty = safe_int(row.get('Final Qty (Units)', row.get('Final Qty', 0)), 0)
-            if final_qty <= 0: continue
-            
-            inv = inv_map.get(sku, {'pack_size': 1, 'weight': 15, 'height': 10})
-            pack_size = safe_int(row.get('Pack Size', inv.get('pack_size', 1)), 1)
-            if pack_size < 1: pack_size = 1
-            
+        for i, qty, unit_qty, pack in zip(
+            keep.tolist(), cases[keep].tolist(), final_qty[keep].tolist(), pack_size[keep].tolist()
+        ):
+            sku, row = row_skus[i], data_rows[i]
+            inv = inv_map[sku]
             pallet_input.append({
-                'SKU': sku, 'Qty': math.ceil(final_qty / pack_size), 'unit_qty': final_qty,
-                'pack_size': pack_size, 'dc_id': str(row.get('DC #', '')),
+                'SKU': sku, 'Qty': qty, 'unit_qty': unit_qty,
+                'pack_size': pack, 'dc_id': str(row.get('DC #', '')),
                 'desc': str(row.get('Description', '')),
                 'box_weight': inv['weight'], 'box_height': inv['height']
             })
 
-        palletizer = Palletizer()
+        palletizer = PALLETIZER
         pallets = palletizer.calculate_pallets(pallet_input)
         
-        doc_gen = DocumentGenerator(settings.OUTPUT_DIR)
-        pl_url, pl_df = doc_gen.generate_packing_list(pallets, DC_LOOKUP)
-        import_url = doc_gen.generate_order_import(pl_df, DC_LOOKUP, site_name, po_number, ship_window)
+        doc_gen = DOC_GEN
+        # xlsx 생성은 워커 스레드에서 수행 (이벤트 루프 차단 방지)
+        pl_url, pl_df = await run_in_threadpool(doc_gen.generate_packing_list, pallets, DC_LOOKUP)
+        import_url = await run_in_threadpool(
+            doc_gen.generate_order_import, pl_df, DC_LOOKUP, site_name, po_number, ship_window
+        )
         
-        return JSONResponse({
+        return ORJSONResponse({
             "status": "success",
             "files": {"order_import": import_url}, # Packing list hidden as requested
             "pallet_plan": pallets
         })
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error calculating pallets: {e}")
         raise HTTPException(500, str(e))
@@ -936,9 +1222,8 @@ async def calculate_pallets(payload: Dict[str, Any] = Body(...)):
 @router.post("/upload_temp_excel")
 async def upload_temp_excel(file: UploadFile = File(...)):
     try:
-        path = os.path.join(settings.TEMP_DIR, file.filename)
-        with open(path, "wb") as buffer: shutil.copyfileobj(file.file, buffer)
-        return {"status": "success", "filename": file.filename}
+        filename = await run_in_threadpool(_store_excel_upload, file.file)
+        return {"status": "success", "filename": filename}
     except Exception as e: raise HTTPException(500, str(e))
 
 
@@ -951,24 +1236,17 @@ async def get_po_reviews(limit: int = 10):
     try:
         reviews_dir = os.path.join(settings.OUTPUT_DIR, "po_reviews")
         
-        if not os.path.exists(reviews_dir):
-            return JSONResponse({
-                "status": "success",
-                "data": []
-            })
-        
-        # List all JSON files in reviews directory
+        # 리뷰 파일명은 기록 timestamp 로 시작하므로 이름 역순 = 최신순
+        # limit 이 있으면 상위 limit 개씩만 읽고, 읽기/파싱 실패로 모자랄 때만 다음 묶음을 읽음
+        # (없는 디렉토리는 빈 목록, 변경되지 않은 파일은 파싱 캐시에서 재사용)
+        paths = sorted(iter_json_files(reviews_dir, recursive=False), reverse=True)
+        batch_size = limit if limit > 0 else len(paths) or 1
         review_files = []
-        for filename in os.listdir(reviews_dir):
-            if filename.endswith('.json'):
-                filepath = os.path.join(reviews_dir, filename)
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        review_data = json.load(f)
-                        review_files.append(review_data)
-                except Exception as e:
-                    logger.warning(f"Failed to read review file {filename}: {e}")
-                    continue
+        for start in range(0, len(paths), batch_size):
+            batch = paths[start:start + batch_size]
+            review_files.extend(data for _, data in await run_in_threadpool(load_json_files_cached, batch))
+            if limit > 0 and len(review_files) >= limit:
+                break
         
         # Sort by timestamp descending
         review_files.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
@@ -976,7 +1254,7 @@ async def get_po_reviews(limit: int = 10):
         # Apply limit
         limited_reviews = review_files[:limit] if limit > 0 else review_files
         
-        return JSONResponse({
+        return ORJSONResponse({
             "status": "success",
             "data": limited_reviews
         })
@@ -997,10 +1275,10 @@ async def delete_reviews():
     """
     try:
         reviews_dir = os.path.join(settings.OUTPUT_DIR, "po_reviews")
-        if os.path.exists(reviews_dir):
-            shutil.rmtree(reviews_dir)
-            os.makedirs(reviews_dir, exist_ok=True)
-        return JSONResponse({"status": "success", "message": "모든 검증 기록이 삭제되었습니다."})
+        # 디렉토리는 유지하고 파일만 병렬 unlink (워커 스레드에서 수행)
+        removed = await run_in_threadpool(clear_dir, reviews_dir)
+        logger.info(f"Deleted {removed} review files from {reviews_dir}")
+        return ORJSONResponse({"status": "success", "message": "모든 검증 기록이 삭제되었습니다."})
     except Exception as e:
         logger.error(f"Error deleting reviews: {e}")
-        return JSONResponse({"status": "error", "message": str(e)})
+        return ORJSONResponse({"status": "error", "message": str(e)})
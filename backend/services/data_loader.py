@@ -1,6 +1,7 @@
 import pandas as pd
 import os
 import math
+import asyncio
 import logging
 from services.firebase_service import firebase_manager
 from core.config import settings
@@ -9,6 +10,20 @@ from firebase_admin import firestore
 # 로깅 설정
 logger = logging.getLogger(__name__)
 
+def normalize_location(location_raw) -> str:
+    """Normalize a raw inventory location (WH_MAIN -> MAIN, WH_SUB -> SUB)."""
+    location = str(location_raw).strip().upper()
+    if not location or location in ('NAN', 'NONE'):
+        return 'MAIN'
+    if 'SUB' in location:
+        return 'SUB'
+    if 'MAIN' in location:
+        return 'MAIN'
+    return location  # Fallback to raw value
+
+# Firestore batch 당 최대 쓰기 수 (한도 500 에 여유를 둠)
+FIRESTORE_BATCH_SIZE = 400
+
 class DataLoader:
     def __init__(self):
         self.data_dir = settings.DATA_DIR
@@ -17,6 +32,10 @@ class DataLoader:
         self.product_map = {}
         self.inventory_map = {}
         self.buyers = []
+        # 바이어 검색용 사전 계산 인덱스 (buyers 와 같은 순서의 이름 목록 + trigram 역색인)
+        self.buyer_names = []
+        self.buyer_names_lower = []
+        self.buyer_trigrams = {}
         
         # Legacy aliases for backward compatibility
         self.products = self.product_map
@@ -63,15 +82,17 @@ class DataLoader:
                     24: 'Max_Height_inches'
                 }
                 
-                for _, row in df.iterrows():
+                # iterrows (행마다 Series 생성) 대신 튜플로 순회
+                n_cols = len(df.columns)
+                for row in df.itertuples(index=False, name=None):
                     # Use column index 0 for SKU
-                    sku = str(row.iloc[0]).strip() if len(row) > 0 else ''
+                    sku = str(row[0]).strip() if n_cols > 0 else ''
                     if sku and sku.lower() not in ['nan', 'none', 'sku', '1']:
                         # Map numeric columns to proper names
                         mapped_row = {}
                         for col_idx, col_name in col_mapping.items():
-                            if col_idx < len(row):
-                                val = row.iloc[col_idx]
+                            if col_idx < n_cols:
+                                val = row[col_idx]
                                 # Convert to proper type
                                 if col_name in ['UnitsPerCase', 'CasePack', 'Max_Cartons_per_Pallet']:
                                     mapped_row[col_name] = self._safe_int(val, 1)
@@ -91,61 +112,124 @@ class DataLoader:
                 logger.error(f"Failed to load products CSV: {e}", exc_info=True)
 
         # Inventory - Now with location details preserved (MAIN vs SUB)
-        i_path = os.path.join(self.data_dir, "inventory_template.csv")
-        if os.path.exists(i_path):
-            try:
-                df = pd.read_csv(i_path, dtype={'sku': str})
-                skipped_rows = 0
-                for idx, row in df.iterrows():
-                    try:
-                        sku = str(row.get('sku', '')).strip()
-                        if not sku or sku.lower() in ['nan', 'none', '']:
-                            continue
-                        
-                        # Parse location: WH_MAIN -> MAIN, WH_SUB -> SUB
-                        location_raw = str(row.get('location', 'MAIN')).strip().upper()
-                        if not location_raw or location_raw.lower() in ['nan', 'none']:
-                            location = 'MAIN'
-                        elif 'SUB' in location_raw:
-                            location = 'SUB'
-                        elif 'MAIN' in location_raw:
-                            location = 'MAIN'
-                        else:
-                            location = location_raw  # Fallback to raw value
-                        
-                        # 안전한 정수 변환 사용
-                        on_hand = self._safe_int(row.get('onHand'), 0)
-                        
-                        if sku not in self.inventory_map:
-                            self.inventory_map[sku] = {
-                                "total": 0,
-                                "locations": {}
-                            }
-                        
-                        # Add to location-specific count
-                        if location not in self.inventory_map[sku]["locations"]:
-                            self.inventory_map[sku]["locations"][location] = 0
-                        
-                        self.inventory_map[sku]["locations"][location] += on_hand
-                        self.inventory_map[sku]["total"] += on_hand
-                    except Exception as row_error:
-                        skipped_rows += 1
-                        logger.warning(f"Skipped inventory row {idx}: {row_error}")
-                        continue
-                    
-                logger.info(f"Inventory loaded: {len(self.inventory_map)} SKUs (skipped {skipped_rows} rows)")
-            except Exception as e:
-                logger.error(f"Failed to load inventory CSV: {e}")
+        self.load_inventory()
 
         # Buyers
         b_path = os.path.join(self.data_dir, "SalesbyJames - db_buyer.csv")
         if os.path.exists(b_path):
             try:
                 self.buyers = pd.read_csv(b_path).to_dict('records')
+                self._build_buyer_index()
                 logger.info(f"Buyers loaded: {len(self.buyers)}")
             except Exception as e:
                 logger.error(f"Failed to load buyers CSV: {e}")
 
+    def load_inventory(self):
+        """
+        inventory_template.csv -> inventory_map (SKU별 합계를 로드 시점에 미리 집계).
+        각 항목은 {"total": int, "locations": {"MAIN": int, "SUB": int, ...}} 형태로,
+        요청 처리 시에는 추가 계산 없이 조회만 하면 됩니다.
+        """
+        i_path = os.path.join(self.data_dir, "inventory_template.csv")
+        if not os.path.exists(i_path):
+            return
+        try:
+            df = pd.read_csv(i_path, dtype={'sku': str})
+            new_map = {}
+            skipped_rows = 0
+            # iterrows 대신 레코드 dict 로 한 번에 변환 (row.get 사용 코드 그대로 유지)
+            for idx, row in enumerate(df.to_dict('records')):
+                try:
+                    sku = str(row.get('sku', '')).strip()
+                    if not sku or sku.lower() in ['nan', 'none', '']:
+                        continue
+                    
+                    # Parse location: WH_MAIN -> MAIN, WH_SUB -> SUB
+                    location = normalize_location(row.get('location', 'MAIN'))
+                    
+                    # 안전한 정수 변환 사용
+                    on_hand = self._safe_int(row.get('onHand'), 0)
+                    
+                    entry = new_map.get(sku)
+                    if entry is None:
+                        entry = new_map[sku] = {
+                            "total": 0,
+                            "locations": {"MAIN": 0, "SUB": 0}
+                        }
+                    
+                    # Add to location-specific count
+                    locations = entry["locations"]
+                    locations[location] = locations.get(location, 0) + on_hand
+                    entry["total"] += on_hand
+                except Exception as row_error:
+                    skipped_rows += 1
+                    logger.warning(f"Skipped inventory row {idx}: {row_error}")
+                    continue
+
+            # 기존 dict 객체를 유지해야 self.inventory 별칭도 함께 갱신됨
+            self.inventory_map.clear()
+            self.inventory_map.update(new_map)
+            logger.info(f"Inventory loaded: {len(self.inventory_map)} SKUs (skipped {skipped_rows} rows)")
+        except Exception as e:
+            logger.error(f"Failed to load inventory CSV: {e}")
+
+    def _build_buyer_index(self):
+        """바이어 표시 이름/소문자 이름 목록과 trigram -> 인덱스 역색인 생성 (로드 시 1회)"""
+        self.buyer_names = [str(buyer.get('Name', buyer.get('Customer Name', ''))) for buyer in self.buyers]
+        self.buyer_names_lower = [name.lower() for name in self.buyer_names]
+        trigrams = {}
+        for idx, name_lower in enumerate(self.buyer_names_lower):
+            for gram in {name_lower[i:i + 3] for i in range(len(name_lower) - 2)}:
+                trigrams.setdefault(gram, []).append(idx)
+        self.buyer_trigrams = trigrams
+
+    def search_buyers(self, query: str, limit: int = 10) -> list:
+        """
+        Case-insensitive substring search over buyer names.
+        Queries of 3+ chars are narrowed with the trigram index before the substring check.
+
+        Returns:
+            List of (display_name, buyer_record) tuples (at most `limit`), in load order
+        """
+        q = query.lower()
+        names_lower = self.buyer_names_lower
+        if len(q) >= 3:
+            candidates = None
+            for gram in {q[i:i + 3] for i in range(len(q) - 2)}:
+                posting = self.buyer_trigrams.get(gram)
+                if not posting:
+                    return []
+                candidates = set(posting) if candidates is None else candidates.intersection(posting)
+                if not candidates:
+                    return []
+            indices = (idx for idx in sorted(candidates) if q in names_lower[idx])
+        else:
+            indices = (idx for idx, name_lower in enumerate(names_lower) if q in name_lower)
+
+        results = []
+        for idx in indices:
+            results.append((self.buyer_names[idx], self.buyers[idx]))
+            if len(results) >= limit:
+                break
+        return results
+
+    async def _commit_writes(self, db, writes) -> int:
+        """
+        Split (doc_ref, data) merge-writes into batches and commit them concurrently
+        on the shared Firestore executor.
+
+        Returns:
+            Number of documents written
+        """
+        batches = []
+        for start in range(0, len(writes), FIRESTORE_BATCH_SIZE):
+            batch = db.batch()
+            for doc_ref, data in writes[start:start + FIRESTORE_BATCH_SIZE]:
+                batch.set(doc_ref, data, merge=True)
+            batches.append(batch)
+        await asyncio.gather(*(firebase_manager.run(batch.commit) for batch in batches))
+        return len(writes)
+
     async def sync_products(self):
         """products_template.csv -> Firebase 'products' 컬렉션"""
         db = firebase_manager.get_db()
@@ -157,9 +241,7 @@ class DataLoader:
 
         try:
             df = pd.read_csv(csv_path, dtype={'SKU': str})
-            batch = db.batch()
-            count = 0
-            total = 0
+            writes = []
 
             for _, row in df.iterrows():
                 sku = str(row['SKU']).strip()
@@ -176,19 +258,9 @@ class DataLoader:
                     'updated_at': firestore.SERVER_TIMESTAMP
                 }
                 
-                batch.set(doc_ref, data, merge=True)
-                count += 1
-                
-                if count >= 400:
-                    batch.commit()
-                    batch = db.batch()
-                    total += count
-                    count = 0
-            
-            if count > 0:
-                batch.commit()
-                total += count
+                writes.append((doc_ref, data))
 
+            total = await self._commit_writes(db, writes)
             return {"status": "success", "message": f"Synced {total} products."}
         except Exception as e:
             return {"status": "error", "message": str(e)}
@@ -204,9 +276,7 @@ class DataLoader:
 
         try:
             df = pd.read_csv(csv_path, dtype={'sku': str})
-            batch = db.batch()
-            count = 0
-            total = 0
+            writes = []
 
             for _, row in df.iterrows():
                 doc_id = str(row.get('docId', '')).strip()
@@ -222,19 +292,9 @@ class DataLoader:
                     'updated_at': firestore.SERVER_TIMESTAMP
                 }
 
-                batch.set(doc_ref, data, merge=True)
-                count += 1
-
-                if count >= 400:
-                    batch.commit()
-                    batch = db.batch()
-                    total += count
-                    count = 0
-            
-            if count > 0:
-                batch.commit()
-                total += count
+                writes.append((doc_ref, data))
 
+            total = await self._commit_writes(db, writes)
             return {"status": "success", "message": f"Synced {total} inventory records."}
         except Exception as e:
             return {"status": "error", "message": str(e)}
@@ -1,16 +1,98 @@
-import math
 import pandas as pd
 import os
 from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from openpyxl import Workbook, load_workbook
 from services.utils import safe_int
 
+
+def _excel_value(value: Any) -> Any:
+    # NaN 은 pandas.to_excel 과 동일하게 빈 셀로 기록
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def write_xlsx_rows(path: str, columns: List[str], rows: Iterable[Dict[str, Any]]) -> None:
+    """
+    Stream row dicts to an .xlsx file with openpyxl's write-only workbook.
+    Rows are flushed as they are appended, so memory stays flat for large sheets.
+
+    Args:
+        path: Destination file path
+        columns: Header row / column order
+        rows: Row dicts keyed by column name (missing keys become empty cells)
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(columns)
+    for row in rows:
+        ws.append([_excel_value(row.get(col)) for col in columns])
+    wb.save(path)
+
+
+def read_xlsx_rows(path: str, columns: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Read the first worksheet of an .xlsx file as row dicts with a read-only workbook.
+    The first row is the header; empty cells are omitted and blank rows are skipped.
+
+    Args:
+        path: Source file path
+        columns: Optional header names to keep (others are not materialized)
+
+    Returns:
+        List of row dicts keyed by header name
+    """
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        header = next(ws.iter_rows(max_row=1, values_only=True), None)
+        if header is None:
+            return []
+        wanted = set(columns) if columns is not None else None
+        index = [
+            (i, str(name)) for i, name in enumerate(header)
+            if name is not None and (wanted is None or str(name) in wanted)
+        ]
+        if not index:
+            return []
+        # 필요한 컬럼 범위만 셀로 만들도록 min_col/max_col 지정 (인덱스는 범위 시작 기준으로 이동)
+        first_col = index[0][0]
+        index = [(i - first_col, name) for i, name in index]
+        rows = ws.iter_rows(
+            min_row=2, min_col=first_col + 1, max_col=first_col + index[-1][0] + 1, values_only=True
+        )
+        records = []
+        for values in rows:
+            record = {}
+            for i, name in index:
+                value = values[i] if i < len(values) else None
+                if value is not None:
+                    record[name] = value
+            if record:
+                records.append(record)
+        return records
+    finally:
+        wb.close()
+
+
+ORDER_IMPORT_COLUMNS = [
+    'Customer', 'trandate', 'otherrefnum', 'memo', 'itemLine_item', 'itemLine_quantity',
+    'itemLine_salesPrice', 'Site', 'Sales Order #', 'Template',
+]
+PACKING_LIST_COLUMNS = [
+    'Pallet ID', 'Pallet Type', 'DC #', 'Ship To', 'Address', 'City/State',
+    'SKU', 'Description', 'Qty (Cases)', 'Unit Qty', 'unit_cost',
+]
+
+
 class DocumentGenerator:
     def __init__(self, output_dir):
         self.output_dir = output_dir
 
     def generate_order_import(self, packing_list_df, dc_lookup, site_name, po_number, ship_window, unit_costs=None):
         """
-        Order Import (QB) 엑셀 생성
+        Order Import (QB) 엑셀 생성 (DataFrame 입력용 래퍼)
         
         Args:
             packing_list_df: DataFrame with packing list data
@@ -20,13 +102,31 @@ class DocumentGenerator:
             ship_window: Ship window string
             unit_costs: Optional dict mapping SKU to unit_cost (for Mother PO pricing)
         """
+        return self.generate_order_import_rows(
+            packing_list_df.to_dict('records'), dc_lookup, site_name, po_number, ship_window, unit_costs
+        )
+
+    def generate_order_import_rows(self, packing_list_rows, dc_lookup, site_name, po_number, ship_window, unit_costs=None):
+        """
+        Order Import (QB) 엑셀 생성
+        
+        Args:
+            packing_list_rows: Iterable of packing list row dicts ('DC #', 'SKU', 'Qty (Cases)', optional 'unit_cost')
+            dc_lookup: DC information lookup dict
+            site_name: Site name for the order
+            po_number: PO number
+            ship_window: Ship window string
+            unit_costs: Optional dict mapping SKU to unit_cost (for Mother PO pricing)
+        """
         import_rows = []
         
         # Build unit_cost lookup if not provided
         if unit_costs is None:
             unit_costs = {}
         
-        for _, row in packing_list_df.iterrows():
+        now = datetime.now()
+        trandate = now.strftime("%m/%d/%Y")
+        for row in packing_list_rows:
             dc_id = str(row['DC #'])
             dc_info = dc_lookup.get(dc_id, {})
             sku = str(row.get('SKU', ''))
@@ -44,7 +144,7 @@ class DocumentGenerator:
             final_po_ref = f"{prefix} {po_number}" if po_number else f"{prefix} (No PO)"
             
             # Sales Order #: "SO-PREFIX-PO#"
-            sales_order_num = f"SO-{prefix}-{po_number}" if po_number else f"SO-{prefix}-{datetime.now().strftime('%m%d')}"
+            sales_order_num = f"SO-{prefix}-{po_number}" if po_number else f"SO-{prefix}-{now.strftime('%m%d')}"
 
             # Get unit_cost for this SKU (>0 for Mother PO, 0 for DC PO)
             # Check row first, then fallback to unit_costs dict
@@ -56,7 +156,7 @@ class DocumentGenerator:
 
             import_rows.append({
                 'Customer': customer,
-                'trandate': datetime.now().strftime("%m/%d/%Y"),
+                'trandate': trandate,
                 'otherrefnum': final_po_ref,
                 'memo': f"Ship Window: {ship_window}", 
                 'itemLine_item': sku,
@@ -67,10 +167,9 @@ class DocumentGenerator:
                 'Template': 'Sales Order Template'
             })
             
-        df = pd.DataFrame(import_rows)
-        filename = f"Order_Import_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+        filename = f"Order_Import_{now.strftime('%Y%m%d_%H%M%S')}.xlsx"
         path = os.path.join(self.output_dir, filename)
-        df.to_excel(path, index=False)
+        write_xlsx_rows(path, ORDER_IMPORT_COLUMNS, import_rows)
         return f"/api/download/{filename}"
 
     def generate_review_worksheet(self, validated_items):
@@ -87,7 +186,7 @@ class DocumentGenerator:
             pack_size = safe_int(item.get('pack_size', 1), default=1)
             if pack_size < 1:
                 pack_size = 1
-            default_case_qty = math.ceil(po_qty / pack_size)
+            default_case_qty = -(-po_qty // pack_size)
             case_qty = safe_int(item.get('case_qty', default_case_qty), default_case_qty)
 
             rows.append({
@@ -130,8 +229,7 @@ class DocumentGenerator:
                     'unit_cost': item.get('unit_cost', 0.0),  # Include unit_cost for order import
                 })
         
-        df = pd.DataFrame(rows)
         filename = f"Packing_List_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
         path = os.path.join(self.output_dir, filename)
-        df.to_excel(path, index=False)
-        return f"/api/download/{filename}", df
+        write_xlsx_rows(path, PACKING_LIST_COLUMNS, rows)
+        return f"/api/download/{filename}", pd.DataFrame(rows, columns=PACKING_LIST_COLUMNS)
@@ -1,12 +1,32 @@
 import firebase_admin
 from firebase_admin import credentials, firestore
 import os
+import asyncio
+import functools
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List
 from core.config import settings
 
 # 로깅 설정
 logger = logging.getLogger(__name__)
 
+# Firestore 'in' 쿼리는 한 번에 30개 값까지만 허용
+FIRESTORE_IN_LIMIT = 30
+# get_all() 한 번에 넘길 문서 참조 수 상한
+FIRESTORE_GET_ALL_LIMIT = 300
+# Firestore 동기 SDK 호출 전용 스레드 수 (동시 요청 폭주 시 backpressure 역할)
+FIRESTORE_MAX_WORKERS = 40
+
+def doc_field(snapshot: Any, field: str, default: Any = None) -> Any:
+    """Read one field from a DocumentSnapshot without materializing to_dict()."""
+    try:
+        value = snapshot.get(field)
+    except KeyError:
+        return default
+    return default if value is None else value
+
 class FirebaseService:
     _instance = None
 
@@ -16,6 +36,7 @@ class FirebaseService:
             cls._instance.db = None
             cls._instance.is_connected = False
             cls._instance.error_msg = None
+            cls._instance._executor = None
             cls._instance.initialize()
         return cls._instance
 
@@ -45,6 +66,91 @@ class FirebaseService:
             self.initialize()
         return self.db
 
+    def start_executor(self):
+        """Create the shared Firestore thread pool (called from the app lifespan)."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=FIRESTORE_MAX_WORKERS, thread_name_prefix='fs')
+
+    def shutdown_executor(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking Firestore call on the shared thread pool."""
+        if self._executor is None:
+            self.start_executor()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args))
+
+    async def fetch_documents_bulk(self, collection: str, doc_ids: Iterable[str]) -> Dict[str, Any]:
+        """
+        Batch-read documents by id with get_all(), one call per FIRESTORE_GET_ALL_LIMIT refs,
+        all chunks run concurrently.
+
+        Args:
+            collection: Collection name
+            doc_ids: Document ids to read
+
+        Returns:
+            Dict of doc id -> DocumentSnapshot for documents that exist
+            (ids that are not valid document ids, or whose chunk failed, are left out)
+        """
+        db = self.get_db()
+        # 빈 문자열 / '/' 포함 id 는 문서 경로가 될 수 없어 get_all 청크 전체를 실패시키므로 제외
+        ids = [doc_id for doc_id in dict.fromkeys(doc_ids) if doc_id and '/' not in doc_id]
+        if not db or not ids:
+            return {}
+        col = db.collection(collection)
+
+        def get_chunk(chunk: List[str]) -> List[Any]:
+            return list(db.get_all([col.document(doc_id) for doc_id in chunk]))
+
+        chunks = [ids[i:i + FIRESTORE_GET_ALL_LIMIT] for i in range(0, len(ids), FIRESTORE_GET_ALL_LIMIT)]
+        found: Dict[str, Any] = {}
+        results = await asyncio.gather(*(self.run(get_chunk, chunk) for chunk in chunks), return_exceptions=True)
+        for chunk, snaps in zip(chunks, results):
+            # 실패한 청크만 건너뜀 (나머지 청크 결과는 유지)
+            if isinstance(snaps, Exception):
+                logger.warning(f"Failed to read {len(chunk)} '{collection}' docs from Firebase: {snaps}")
+                continue
+            for snap in snaps:
+                if snap.exists:
+                    found[snap.id] = snap
+        return found
+
+    async def fetch_inventory_bulk(self, skus: Iterable[str]) -> Dict[str, List[Any]]:
+        """
+        Fetch inventory docs for many SKUs with chunked 'in' queries run concurrently.
+
+        Args:
+            skus: SKU strings to look up
+
+        Returns:
+            Dict of sku -> list of inventory DocumentSnapshots (empty list when none);
+            SKUs whose chunk query failed are left out so callers can tell them from "no stock"
+        """
+        result: Dict[str, List[Any]] = {sku: [] for sku in skus}
+        db = self.get_db()
+        if not db or not result:
+            return result
+
+        def query(chunk: List[str]) -> List[Any]:
+            return list(db.collection('inventory').where('sku', 'in', chunk).stream())
+
+        sku_iter = iter(result)
+        chunks = list(iter(lambda: list(islice(sku_iter, FIRESTORE_IN_LIMIT)), []))
+        results = await asyncio.gather(*(self.run(query, chunk) for chunk in chunks), return_exceptions=True)
+        for chunk, docs in zip(chunks, results):
+            if isinstance(docs, Exception):
+                logger.warning(f"Failed to query inventory for {len(chunk)} SKUs from Firebase: {docs}")
+                for sku in chunk:
+                    del result[sku]
+                continue
+            for doc in docs:
+                result.setdefault(doc.get('sku'), []).append(doc)
+        return result
+
     def check_health(self):
         return {
             "status": "ok" if self.is_connected else "error",
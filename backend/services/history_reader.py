@@ -0,0 +1,157 @@
+"""
+History Reader Service.
+Scans output directories for JSON records and parses them in parallel.
+"""
+import os
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import orjson
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 파일 읽기는 I/O 바운드이므로 CPU 수보다 넉넉하게 스레드 할당
+_READ_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+_read_pool = ThreadPoolExecutor(max_workers=_READ_WORKERS, thread_name_prefix="json-read")
+
+# 파싱된 JSON 캐시: path -> ((st_mtime_ns, st_size), data), LRU 로 크기 제한
+PARSED_CACHE_SIZE = 4096
+_parsed_cache: "OrderedDict[str, Tuple[Tuple[int, int], Dict[str, Any]]]" = OrderedDict()
+_parsed_cache_lock = threading.Lock()
+
+
+def iter_json_files(root: str, recursive: bool = True) -> Iterator[str]:
+    """
+    Yield paths of *.json files under root using os.scandir.
+
+    Args:
+        root: Directory to scan
+        recursive: Descend into sub-directories when True
+
+    Returns:
+        Iterator of file paths (missing root yields nothing)
+    """
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.name.endswith('.json') and entry.is_file():
+                        yield entry.path
+                    elif recursive and entry.is_dir():
+                        stack.append(entry.path)
+        except FileNotFoundError:
+            continue
+
+
+def _read_file_bytes(path: str) -> bytes:
+    """Read a whole file with raw fd calls (open + fstat + read, no buffered-IO overhead)."""
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        size = os.fstat(fd).st_size
+        chunks = []
+        while True:
+            chunk = os.read(fd, max(size, 65536))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            size = 0
+        return b''.join(chunks) if len(chunks) != 1 else chunks[0]
+    finally:
+        os.close(fd)
+
+
+def _read_file_or_none(path: str) -> Optional[bytes]:
+    try:
+        return _read_file_bytes(path)
+    except OSError as e:
+        logger.warning(f"Failed to read file {path}: {e}")
+        return None
+
+
+def read_many(paths: List[str]) -> List[Optional[bytes]]:
+    """
+    Read many small files concurrently.
+
+    Args:
+        paths: File paths to read
+
+    Returns:
+        List of file contents aligned with paths (None for unreadable files)
+    """
+    if not paths:
+        return []
+    return list(_read_pool.map(_read_file_or_none, paths))
+
+
+def load_json_files(paths: List[str]) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Read and parse JSON files concurrently.
+
+    Args:
+        paths: File paths to read
+
+    Returns:
+        List of (path, parsed_data) in input order; unreadable files are skipped
+    """
+    results = []
+    for path, raw in zip(paths, read_many(paths)):
+        if raw is None:
+            continue
+        try:
+            results.append((path, orjson.loads(raw)))
+        except orjson.JSONDecodeError as e:
+            logger.warning(f"Failed to parse JSON file {path}: {e}")
+    return results
+
+
+def load_json_files_cached(paths: List[str]) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Same as load_json_files, but reuses parsed data for files whose (mtime_ns, size) is unchanged.
+    Unchanged files cost one stat; only new or modified files are read and parsed.
+    Cached dicts are shared between callers and must be treated as read-only.
+
+    Args:
+        paths: File paths to read
+
+    Returns:
+        List of (path, parsed_data) in input order; unreadable files are skipped
+    """
+    results: List[Optional[Tuple[str, Dict[str, Any]]]] = [None] * len(paths)
+    misses: List[Tuple[int, int, Tuple[int, int]]] = []
+    for i, path in enumerate(paths):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        key = (st.st_mtime_ns, st.st_size)
+        with _parsed_cache_lock:
+            cached = _parsed_cache.get(path)
+            if cached is not None and cached[0] == key:
+                _parsed_cache.move_to_end(path)
+                results[i] = (path, cached[1])
+                continue
+        misses.append((st.st_ino, i, key))
+
+    if misses:
+        # 읽기는 inode 순서로 제출 (HDD 에서 inode 테이블 순차 접근, 결과 순서는 results 인덱스로 유지)
+        misses.sort()
+        loaded = dict(load_json_files([paths[i] for _, i, _ in misses]))
+        with _parsed_cache_lock:
+            for _, i, key in misses:
+                path = paths[i]
+                data = loaded.get(path)
+                if data is None:
+                    continue
+                results[i] = (path, data)
+                _parsed_cache[path] = (key, data)
+                _parsed_cache.move_to_end(path)
+            while len(_parsed_cache) > PARSED_CACHE_SIZE:
+                _parsed_cache.popitem(last=False)
+
+    return [r for r in results if r is not None]
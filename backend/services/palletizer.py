@@ -1,5 +1,5 @@
 import pandas as pd
-import math
+import numpy as np
 from core.config import settings
 
 class Palletizer:
@@ -14,21 +14,29 @@ class Palletizer:
         Args:
             config: Optional dict with pallet settings (for testing/override)
         """
-        # Load from settings if config not provided
-        if config is None:
-            system_config = settings._load_system_config()
-            config = system_config
-        
         # Pallet dimensions (fixed)
         self.PALLET_WIDTH = 40
         self.PALLET_LENGTH = 48
         self.PALLET_BASE_HEIGHT = 6
         
-        # Configurable constraints from system_config.json
+        # Load from settings if config not provided (재사용 인스턴스는 설정 변경 시 자동 갱신)
+        self._fixed_config = config is not None
+        self._apply_config(config if config is not None else settings._load_system_config())
+
+    def _apply_config(self, config):
+        """Configurable constraints from system_config.json"""
+        self._config_src = config
         self.MAX_HEIGHT = int(config.get('pallet_max_height', 68))
         self.MAX_WEIGHT = int(config.get('pallet_max_weight', 2500))
         self.PALLET_BASE_WEIGHT = int(config.get('pallet_base_weight', 40))
 
+    def _refresh_config(self):
+        """Re-apply limits when system_config.json changed (no-op for an explicit config)."""
+        if not self._fixed_config:
+            config = settings._load_system_config()
+            if config is not self._config_src:
+                self._apply_config(config)
+
     def calculate_pallets(self, order_items):
         """
         구글 스프레드시트 로직 기반 팔레타이징:
@@ -46,122 +54,147 @@ class Palletizer:
         
         Returns: List of pallet dicts
         """
+        n = len(order_items)
+        return self.calculate_pallets_arrays(
+            skus=[str(item.get('sku', '')).strip() for item in order_items],
+            case_qty=np.fromiter(
+                ((item.get('case_qty', 0) or item.get('po_qty', 0)) for item in order_items), dtype=np.int64, count=n
+            ),
+            pack_size=np.fromiter((item.get('pack_size', 1) for item in order_items), dtype=np.int64, count=n),
+            weight_lbs=np.fromiter((item.get('weight_lbs', 15.0) for item in order_items), dtype=np.float64, count=n),
+            height_inches=np.fromiter((item.get('height_inches', 10.0) for item in order_items), dtype=np.float64, count=n),
+            max_ct=np.fromiter(
+                ((item.get('max_cartons_per_pallet', 20) or 0) for item in order_items), dtype=np.int64, count=n
+            ),
+            descriptions=[item.get('description', '') for item in order_items],
+        )
+
+    def calculate_pallets_arrays(self, skus, case_qty, pack_size, weight_lbs, height_inches, max_ct, descriptions=None):
+        """
+        calculate_pallets 의 배열(SoA) 버전. 품목별 Full Pallet 수와 잔량을 NumPy 로 한 번에 계산.
+
+        Args:
+            skus: SKU 목록
+            case_qty: 주문 카톤 수 (int64 array)
+            pack_size: case pack (int64 array)
+            weight_lbs: 카톤 무게 (float64 array)
+            height_inches: 카톤 높이 (float64 array)
+            max_ct: 팔레트당 최대 카톤 수 (int64 array, 0 이하면 20)
+            descriptions: 품목 설명 목록 (optional)
+
+        Returns: List of pallet dicts
+        """
+        self._refresh_config()
         pallets = []
         pallet_counter = 1
         splitted_items = []  # 부피 < 1.0인 잔량들
-        
-        # 1. Full Pallet 생성 및 잔량 수집
-        for item in order_items:
-            sku = str(item.get('sku', '')).strip()
-            case_qty = item.get('case_qty', 0) or item.get('po_qty', 0)
-            
-            if case_qty <= 0:
-                continue
-            
-            # Max CT: Product 데이터에서 가져오기, 없으면 20 기본값
-            max_ct = item.get('max_cartons_per_pallet', 20)
-            if not max_ct or max_ct <= 0:
-                max_ct = 20
-            
-            unit_plt = 1.0 / max_ct  # 1 카튼당 팔레트 부피
-            
-            qty_left = case_qty
-            
+
+        case_qty = np.asarray(case_qty, dtype=np.int64)
+        max_ct = np.asarray(max_ct, dtype=np.int64)
+        max_ct = np.where(max_ct > 0, max_ct, 20)
+        unit_plt = 1.0 / max_ct  # 1 카튼당 팔레트 부피
+
+        # 1. Full Pallet 수와 잔량 계산
+        full_count = case_qty // max_ct
+        remainder = case_qty - full_count * max_ct
+        # 부동소수 오차로 max_ct * (1/max_ct) < 1.0 인 경우(예: 49) 마지막 한 팔레트는 잔량으로 처리
+        short_full = (remainder == 0) & (full_count > 0) & (max_ct * unit_plt < 1.0)
+        full_count = np.where(short_full, full_count - 1, full_count)
+        remainder = np.where(short_full, max_ct, remainder)
+        volume = remainder * unit_plt
+
+        active = np.flatnonzero(case_qty > 0)
+        if descriptions is None:
+            descriptions = [''] * len(skus)
+        pack_list = np.asarray(pack_size).tolist()
+        weight_list = np.asarray(weight_lbs, dtype=np.float64).tolist()
+        height_list = np.asarray(height_inches, dtype=np.float64).tolist()
+        max_ct_list = max_ct.tolist()
+        full_list = full_count.tolist()
+        rem_list = remainder.tolist()
+        volume_list = volume.tolist()
+
+        split_idx = []  # 부피 < 1.0 인 잔량 품목 인덱스
+        for i in active.tolist():
+            sku = skus[i]
+            description = descriptions[i]
+            item_pack = pack_list[i]
+            item_max_ct = max_ct_list[i]
+
             # Full Pallet 생성 (부피 = 1.0)
-            while qty_left > 0:
-                total_plt = qty_left * unit_plt
-                
-                if total_plt >= 1.0:
-                    # Full Pallet 생성
-                    full_qty = int(math.floor(max_ct))
-                    
-                    pallets.append({
-                        'name': f'Pallet #{pallet_counter}',
-                        'pallet_number': pallet_counter,
-                        'type': 'FULL',
-                        'skus': [sku],
-                        'items': [{
-                            'sku': sku,
-                            'qty': full_qty,
-                            'description': item.get('description', ''),
-                            'pack_size': item.get('pack_size', 1)
-                        }],
-                        'total_units': full_qty * item.get('pack_size', 1),
-                        'total_cartons': full_qty,
-                        'total_weight': full_qty * item.get('weight_lbs', 15.0) + self.PALLET_BASE_WEIGHT,
-                        'total_height': item.get('height_inches', 10.0) * (full_qty / max_ct * 10) + self.PALLET_BASE_HEIGHT,
-                        'utilization_percent': 100
-                    })
-                    pallet_counter += 1
-                    qty_left -= full_qty
-                else:
-                    # 잔량 - splitted items에 추가
-                    volume = total_plt
-                    splitted_items.append({
+            for _ in range(full_list[i]):
+                pallets.append({
+                    'name': f'Pallet #{pallet_counter}',
+                    'pallet_number': pallet_counter,
+                    'type': 'FULL',
+                    'skus': [sku],
+                    'items': [{
                         'sku': sku,
-                        'volume': volume,
-                        'qty': qty_left,
-                        'max_ct': max_ct,
-                        'description': item.get('description', ''),
-                        'pack_size': item.get('pack_size', 1),
-                        'weight_lbs': item.get('weight_lbs', 15.0),
-                        'height_inches': item.get('height_inches', 10.0)
-                    })
-                    qty_left = 0
-        
+                        'qty': item_max_ct,
+                        'description': description,
+                        'pack_size': item_pack
+                    }],
+                    'total_units': item_max_ct * item_pack,
+                    'total_cartons': item_max_ct,
+                    'total_weight': item_max_ct * weight_list[i] + self.PALLET_BASE_WEIGHT,
+                    'total_height': height_list[i] * 10.0 + self.PALLET_BASE_HEIGHT,
+                    'utilization_percent': 100
+                })
+                pallet_counter += 1
+
+            # 잔량 - mixed pallet 후보
+            if rem_list[i] > 0:
+                split_idx.append(i)
+
         # 2. Mixed Pallet 생성 (First Fit Decreasing)
-        # 큰 부피부터 정렬
-        splitted_items.sort(key=lambda x: x['volume'], reverse=True)
-        
-        bin_list = []  # 각 bin = 하나의 mixed pallet
-        
-        for item in splitted_items:
-            placed = False
-            
-            # 기존 bin에 넣을 수 있는지 확인
-            for bin_obj in bin_list:
-                if bin_obj['total_volume'] + item['volume'] <= 1.0:
-                    bin_obj['items'].append(item)
-                    bin_obj['total_volume'] += item['volume']
-                    placed = True
+        # 큰 부피부터 정렬 (안정 정렬: 같은 부피는 입력 순서 유지)
+        split_idx.sort(key=volume_list.__getitem__, reverse=True)
+
+        # bin 은 품목 인덱스 목록 + 누적 부피 (품목별 dict 없이 인덱스/float 만 사용)
+        bin_items = []
+        bin_volumes = []
+        for i in split_idx:
+            item_volume = volume_list[i]
+            for b, bin_volume in enumerate(bin_volumes):
+                if bin_volume + item_volume <= 1.0:
+                    bin_items[b].append(i)
+                    bin_volumes[b] = bin_volume + item_volume
                     break
-            
-            # 넣을 수 없으면 새 bin 생성
-            if not placed:
-                bin_list.append({
-                    'items': [item],
-                    'total_volume': item['volume']
-                })
-        
+            else:
+                # 넣을 수 없으면 새 bin 생성
+                bin_items.append([i])
+                bin_volumes.append(item_volume)
+
         # 3. Mixed Pallet을 최종 pallets 리스트에 추가
-        for bin_obj in bin_list:
+        for members, bin_volume in zip(bin_items, bin_volumes):
             pal_items = []
             total_cartons = 0
             total_units = 0
             total_weight = self.PALLET_BASE_WEIGHT
             max_height = 0
-            skus = []
-            
-            for it in bin_obj['items']:
+            pallet_skus = []
+
+            for i in members:
+                qty = rem_list[i]
                 pal_items.append({
-                    'sku': it['sku'],
-                    'qty': it['qty'],
-                    'description': it['description'],
-                    'pack_size': it['pack_size']
+                    'sku': skus[i],
+                    'qty': qty,
+                    'description': descriptions[i],
+                    'pack_size': pack_list[i]
                 })
-                total_cartons += it['qty']
-                total_units += it['qty'] * it['pack_size']
-                total_weight += it['qty'] * it['weight_lbs']
-                max_height = max(max_height, it['height_inches'])
-                skus.append(it['sku'])
-            
-            utilization_pct = int(bin_obj['total_volume'] * 100)
-            
+                total_cartons += qty
+                total_units += qty * pack_list[i]
+                total_weight += qty * weight_list[i]
+                max_height = max(max_height, height_list[i])
+                pallet_skus.append(skus[i])
+
+            utilization_pct = int(bin_volume * 100)
+
             pallets.append({
                 'name': f'Pallet #{pallet_counter}',
                 'pallet_number': pallet_counter,
                 'type': 'MIXED',
-                'skus': skus,
+                'skus': pallet_skus,
                 'items': pal_items,
                 'total_units': total_units,
                 'total_cartons': total_cartons,
@@ -9,24 +9,35 @@ class PalletizerEMD:
         Args:
             config: Optional dict with pallet settings (for testing/override)
         """
-        # Load from settings if config not provided
-        if config is None:
-            system_config = settings._load_system_config()
-            config = system_config
-        
         # Pallet dimensions (fixed)
         self.PALLET_WIDTH = 40
         self.PALLET_LENGTH = 48
         self.PALLET_BASE_HEIGHT = 6
         
-        # Configurable constraint from system_config.json
-        # EMD uses same max_height as MMD
+        # Load from settings if config not provided (재사용 인스턴스는 설정 변경 시 자동 갱신)
+        self._fixed_config = config is not None
+        self._apply_config(config if config is not None else settings._load_system_config())
+
+    def _apply_config(self, config):
+        """
+        Configurable constraint from system_config.json
+        EMD uses same max_height as MMD
+        """
+        self._config_src = config
         self.MAX_HEIGHT = int(config.get('pallet_max_height', 68))
 
+    def _refresh_config(self):
+        """Re-apply limits when system_config.json changed (no-op for an explicit config)."""
+        if not self._fixed_config:
+            config = settings._load_system_config()
+            if config is not self._config_src:
+                self._apply_config(config)
+
     def calculate_pallets(self, order_items):
         """
         EMD용 단순 적재 로직 (DC 구분 없음)
         """
+        self._refresh_config()
         # 모든 아이템을 하나의 리스트로 처리
         # 박스 사이즈 정보가 없으므로, 기본 부피/높이 가정하여 적재
         
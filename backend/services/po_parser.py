@@ -1,9 +1,9 @@
 import pdfplumber
 import re
-import math
 import logging
 from datetime import datetime
 from typing import List, Dict, Any, Tuple, Optional
+from services.utils import norm_sku
 
 # 로깅 설정
 logger = logging.getLogger(__name__)
@@ -427,7 +427,7 @@ def parse_po(pdf_path: str) -> Tuple[List[Dict[str, Any]], Optional[str]]:
                             continue
                         
                         # Extract SKU
-                        sku = str(row[sku_idx]).strip() if row[sku_idx] else ''
+                        sku = norm_sku(row[sku_idx]) if row[sku_idx] else ''
                         if not sku or sku.upper() in ['', 'TOTAL', 'SUBTOTAL']:
                             continue
                         
@@ -473,7 +473,7 @@ def parse_po(pdf_path: str) -> Tuple[List[Dict[str, Any]], Optional[str]]:
                                     'description': description,
                                     'po_qty': total_qty,
                                     'pack_size': pack_size,
-                                    'case_qty': math.ceil(total_qty / pack_size),
+                                    'case_qty': -(-total_qty // pack_size),
                                     'unit_cost': unit_cost,  # Keep cost for Mother PO
                                     'dc_id': '',
                                     'sales_order_num': sales_order_num,
@@ -510,7 +510,7 @@ def parse_po(pdf_path: str) -> Tuple[List[Dict[str, Any]], Optional[str]]:
                                     'description': description,
                                     'po_qty': dc_qty,
                                     'pack_size': pack_size,
-                                    'case_qty': math.ceil(dc_qty / pack_size),
+                                    'case_qty': -(-dc_qty // pack_size),
                                     'unit_cost': 0.0,  # Cost = 0 for DC POs
                                     'dc_id': dc_id,
                                     'dc_po_prefix': dc_prefix,  # Add PO prefix for DC PO number construction
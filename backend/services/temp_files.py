@@ -0,0 +1,91 @@
+"""
+Temp File Service.
+Removes stale transient uploads (e.g. from UPLOAD_TMP_DIR) in the background,
+and bulk-clears directories of small files.
+"""
+import os
+import time
+import shutil
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 정리 주기 (초)
+SWEEP_INTERVAL = 300
+
+# unlink 는 syscall 바운드이므로 여러 개를 동시에 진행
+_UNLINK_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+_unlink_pool = ThreadPoolExecutor(max_workers=_UNLINK_WORKERS, thread_name_prefix="unlink")
+
+
+def sweep_dir(directory: str, max_age: float) -> int:
+    """
+    Delete regular files in directory whose mtime is older than max_age seconds.
+
+    Args:
+        directory: Directory to clean (not recursive)
+        max_age: Age threshold in seconds
+
+    Returns:
+        Number of files removed
+    """
+    cutoff = time.time() - max_age
+    removed = 0
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                try:
+                    if entry.is_file(follow_symlinks=False) and entry.stat().st_mtime < cutoff:
+                        os.unlink(entry.path)
+                        removed += 1
+                except FileNotFoundError:
+                    continue
+                except OSError as e:
+                    logger.warning(f"Failed to remove stale temp file {entry.path}: {e}")
+    except FileNotFoundError:
+        pass
+    return removed
+
+
+def _unlink_quiet(path: str) -> bool:
+    try:
+        os.unlink(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def clear_dir(directory: str) -> int:
+    """
+    Remove everything inside directory but keep the directory itself.
+    Files are unlinked concurrently; sub-directories fall back to shutil.rmtree.
+
+    Args:
+        directory: Directory to empty (missing directory is a no-op)
+
+    Returns:
+        Number of files removed at the top level
+    """
+    files, dirs = [], []
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                (dirs if entry.is_dir(follow_symlinks=False) else files).append(entry.path)
+    except FileNotFoundError:
+        return 0
+    removed = sum(_unlink_pool.map(_unlink_quiet, files))
+    for path in dirs:
+        shutil.rmtree(path, ignore_errors=True)
+    return removed
+
+
+async def sweep_forever(directory: str, max_age: float, interval: float = SWEEP_INTERVAL) -> None:
+    """Run sweep_dir on a worker thread every interval seconds until cancelled."""
+    while True:
+        removed = await asyncio.to_thread(sweep_dir, directory, max_age)
+        if removed:
+            logger.info(f"Removed {removed} stale temp files from {directory}")
+        await asyncio.sleep(interval)
@@ -1,4 +1,7 @@
 import math
+import sys
+import time
+from collections import OrderedDict
 from typing import Any, Dict, List, Union
 
 def safe_int(value, default: int = 0) -> int:
@@ -18,6 +21,10 @@ def safe_float(value, default: float = 0.0) -> float:
     except (TypeError, ValueError):
         return default
 
+def norm_sku(value) -> str:
+    """Normalize a SKU once (str + strip) and intern it so repeated dict lookups hit by identity."""
+    return sys.intern(str(value).strip())
+
 def sanitize_for_json(obj: Any) -> Any:
     """
     Recursively sanitize data structure to ensure JSON compatibility.
@@ -39,3 +46,38 @@ def sanitize_for_json(obj: Any) -> Any:
             return str(obj)
         except:
             return None
+
+
+class TTLCache:
+    """
+    Small in-process LRU cache whose entries expire ttl seconds after insertion.
+    Not thread-safe; intended for use from the event loop.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, tuple]" = OrderedDict()
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        self._data.clear()
@@ -3,6 +3,7 @@ Validator Service for PO Processing System.
 Provides smart inventory validation with Main-First -> Sub-Second logic.
 """
 import logging
+from types import MappingProxyType
 from typing import List, Dict, Any, Optional
 from core.config import settings
 from services.data_loader import data_loader
@@ -17,6 +18,10 @@ STATUS_OUT_OF_STOCK = "🚨 Out of Stock"
 STATUS_PRICE_MISMATCH = "가격 불일치"
 STATUS_PRODUCT_MISSING = "제품 미등록"
 
+# 조회 실패 시 공용 기본값 (행마다 새 dict 를 만들지 않도록 읽기 전용 싱글톤 사용)
+_EMPTY = MappingProxyType({})
+_EMPTY_INVENTORY = MappingProxyType({"total": 0, "locations": _EMPTY})
+
 
 def resolve_safety_stock(safety_stock_value: Optional[int] = None) -> int:
     """Resolve safety stock value with sane defaults."""
@@ -71,9 +76,10 @@ def validate_po_data(
             item_stock_mode = "TOTAL"
         
         # Get inventory data for SKU
-        inv_data = inventory_map.get(sku, {"total": 0, "locations": {}})
-        main_stock = int(inv_data.get("locations", {}).get("MAIN", 0))
-        sub_stock = int(inv_data.get("locations", {}).get("SUB", 0))
+        inv_data = inventory_map.get(sku, _EMPTY_INVENTORY)
+        locations = inv_data.get("locations", _EMPTY)
+        main_stock = int(locations.get("MAIN", 0))
+        sub_stock = int(locations.get("SUB", 0))
         total_stock = int(inv_data.get("total", 0))
         available_main = max(0, main_stock - effective_safety_stock)
         available_sub = max(0, sub_stock - effective_safety_stock)
@@ -86,7 +92,7 @@ def validate_po_data(
         available_stock = available_by_mode.get(item_stock_mode, available_total)
         
         # Get product data for price comparison
-        prod_data = product_map.get(sku, {})
+        prod_data = product_map.get(sku, _EMPTY)
         system_cost = float(prod_data.get('KeyAccountPrice_TJX', 0.0) or 0.0)
 
         # Safety stock is reserved by reducing available stock; required quantity stays as PO qty.
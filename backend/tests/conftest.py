@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 앱 코드는 backend/ 를 기준으로 import 됨 (core.*, services.*)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
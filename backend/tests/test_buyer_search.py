@@ -0,0 +1,51 @@
+"""
+DataLoader.search_buyers: the trigram index must return the same hits, in load order,
+as a plain substring scan over buyer names.
+"""
+import random
+
+from services.data_loader import DataLoader
+
+
+def _loader_with(names):
+    loader = DataLoader()
+    loader.buyers = [{'Name': name, 'id': i} for i, name in enumerate(names)]
+    loader._build_buyer_index()
+    return loader
+
+
+def _scan(names, query, limit):
+    q = query.lower()
+    return [name for name in names if q in name.lower()][:limit]
+
+
+def test_short_query_uses_substring_scan():
+    loader = _loader_with(["Ross Stores", "TJX", "HomeGoods", "ab", "Marshalls"])
+    assert [name for name, _ in loader.search_buyers("s", limit=10)] == ["Ross Stores", "HomeGoods", "Marshalls"]
+    assert [name for name, _ in loader.search_buyers("AB", limit=10)] == ["ab"]
+    assert loader.search_buyers("zz", limit=10) == []
+
+
+def test_limit_is_exact():
+    names = [f"Buyer {i:02d}" for i in range(25)]
+    loader = _loader_with(names)
+    for query in ("buyer", "b", "er "):
+        results = loader.search_buyers(query, limit=10)
+        assert len(results) == 10
+        assert [name for name, _ in results] == names[:10]
+
+
+def test_results_keep_buyer_records():
+    loader = _loader_with(["Alpha Corp", "Beta Corp"])
+    assert loader.search_buyers("beta") == [("Beta Corp", {'Name': "Beta Corp", 'id': 1})]
+
+
+def test_matches_substring_scan_on_random_names():
+    rng = random.Random(0)
+    alphabet = "abcAB c"
+    names = ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12))) for _ in range(300)]
+    loader = _loader_with(names)
+    for _ in range(500):
+        query = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 5)))
+        limit = rng.choice([1, 10, 1000])
+        assert [name for name, _ in loader.search_buyers(query, limit=limit)] == _scan(names, query, limit)
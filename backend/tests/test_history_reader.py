@@ -0,0 +1,76 @@
+"""
+history_reader.load_json_files_cached: unchanged files are served from the parsed cache,
+changed/removed/unreadable files are handled like load_json_files.
+"""
+import os
+
+import orjson
+import pytest
+
+from services import history_reader
+from services.history_reader import load_json_files, load_json_files_cached
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    history_reader._parsed_cache.clear()
+    yield
+    history_reader._parsed_cache.clear()
+
+
+def _write(path, data, mtime_ns=None):
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(data))
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_matches_load_json_files_in_input_order(tmp_path):
+    paths = []
+    for i in range(20):
+        path = str(tmp_path / f"{i:02d}.json")
+        _write(path, {"i": i})
+        paths.append(path)
+    (tmp_path / "bad.json").write_bytes(b"{not json")
+    paths.insert(5, str(tmp_path / "bad.json"))
+    paths.insert(0, str(tmp_path / "missing.json"))
+    paths.reverse()
+
+    assert load_json_files_cached(paths) == load_json_files(paths)
+    # 두 번째 호출은 캐시에서 같은 결과
+    assert load_json_files_cached(paths) == load_json_files(paths)
+
+
+def test_unchanged_file_reuses_parsed_object(tmp_path):
+    path = str(tmp_path / "a.json")
+    _write(path, {"v": 1})
+    first = load_json_files_cached([path])[0][1]
+    assert load_json_files_cached([path])[0][1] is first
+
+
+def test_modified_file_is_reparsed(tmp_path):
+    path = str(tmp_path / "a.json")
+    _write(path, {"v": 1}, mtime_ns=1_000_000_000)
+    assert load_json_files_cached([path]) == [(path, {"v": 1})]
+    # 크기가 같아도 mtime 이 바뀌면 다시 읽음
+    _write(path, {"v": 2}, mtime_ns=2_000_000_000)
+    assert load_json_files_cached([path]) == [(path, {"v": 2})]
+
+
+def test_removed_file_is_skipped(tmp_path):
+    path = str(tmp_path / "a.json")
+    _write(path, {"v": 1})
+    load_json_files_cached([path])
+    os.remove(path)
+    assert load_json_files_cached([path]) == []
+
+
+def test_cache_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(history_reader, "PARSED_CACHE_SIZE", 3)
+    paths = []
+    for i in range(5):
+        path = str(tmp_path / f"{i}.json")
+        _write(path, {"i": i})
+        paths.append(path)
+    assert len(load_json_files_cached(paths)) == 5
+    assert len(history_reader._parsed_cache) == 3
@@ -0,0 +1,147 @@
+"""
+Palletizer regression tests: the NumPy/FFD implementation must match the original
+per-item loop for randomized orders.
+"""
+import math
+import random
+
+import pytest
+
+from services.palletizer import Palletizer
+
+
+def _reference_pallets(order_items, base_weight, base_height):
+    """Original (pre-vectorization) calculate_pallets, kept verbatim as the oracle."""
+    pallets = []
+    pallet_counter = 1
+    splitted_items = []
+
+    for item in order_items:
+        sku = str(item.get('sku', '')).strip()
+        case_qty = item.get('case_qty', 0) or item.get('po_qty', 0)
+        if case_qty <= 0:
+            continue
+        max_ct = item.get('max_cartons_per_pallet', 20)
+        if not max_ct or max_ct <= 0:
+            max_ct = 20
+        unit_plt = 1.0 / max_ct
+        qty_left = case_qty
+        while qty_left > 0:
+            total_plt = qty_left * unit_plt
+            if total_plt >= 1.0:
+                full_qty = int(math.floor(max_ct))
+                pallets.append({
+                    'name': f'Pallet #{pallet_counter}',
+                    'pallet_number': pallet_counter,
+                    'type': 'FULL',
+                    'skus': [sku],
+                    'items': [{
+                        'sku': sku,
+                        'qty': full_qty,
+                        'description': item.get('description', ''),
+                        'pack_size': item.get('pack_size', 1)
+                    }],
+                    'total_units': full_qty * item.get('pack_size', 1),
+                    'total_cartons': full_qty,
+                    'total_weight': full_qty * item.get('weight_lbs', 15.0) + base_weight,
+                    'total_height': item.get('height_inches', 10.0) * (full_qty / max_ct * 10) + base_height,
+                    'utilization_percent': 100
+                })
+                pallet_counter += 1
+                qty_left -= full_qty
+            else:
+                splitted_items.append({
+                    'sku': sku,
+                    'volume': total_plt,
+                    'qty': qty_left,
+                    'description': item.get('description', ''),
+                    'pack_size': item.get('pack_size', 1),
+                    'weight_lbs': item.get('weight_lbs', 15.0),
+                    'height_inches': item.get('height_inches', 10.0)
+                })
+                qty_left = 0
+
+    splitted_items.sort(key=lambda x: x['volume'], reverse=True)
+    bin_list = []
+    for item in splitted_items:
+        for bin_obj in bin_list:
+            if bin_obj['total_volume'] + item['volume'] <= 1.0:
+                bin_obj['items'].append(item)
+                bin_obj['total_volume'] += item['volume']
+                break
+        else:
+            bin_list.append({'items': [item], 'total_volume': item['volume']})
+
+    for bin_obj in bin_list:
+        pal_items = []
+        total_cartons = 0
+        total_units = 0
+        total_weight = base_weight
+        max_height = 0
+        skus = []
+        for it in bin_obj['items']:
+            pal_items.append({
+                'sku': it['sku'],
+                'qty': it['qty'],
+                'description': it['description'],
+                'pack_size': it['pack_size']
+            })
+            total_cartons += it['qty']
+            total_units += it['qty'] * it['pack_size']
+            total_weight += it['qty'] * it['weight_lbs']
+            max_height = max(max_height, it['height_inches'])
+            skus.append(it['sku'])
+        pallets.append({
+            'name': f'Pallet #{pallet_counter}',
+            'pallet_number': pallet_counter,
+            'type': 'MIXED',
+            'skus': skus,
+            'items': pal_items,
+            'total_units': total_units,
+            'total_cartons': total_cartons,
+            'total_weight': total_weight,
+            'total_height': max_height + base_height,
+            'utilization_percent': int(bin_obj['total_volume'] * 100)
+        })
+        pallet_counter += 1
+
+    return pallets
+
+
+def _random_order(rng):
+    items = []
+    for i in range(rng.randint(0, 40)):
+        item = {
+            'sku': f"S{rng.randint(0, 30)}",
+            'po_qty': rng.choice([0, rng.randint(1, 150)]),
+            'pack_size': rng.randint(1, 12),
+            'weight_lbs': rng.uniform(1, 40),
+            'height_inches': rng.uniform(2, 20),
+            'description': f"desc {i}",
+        }
+        # Max CT: 누락 / 0 이하 / 부동소수 경계값(49 등) 포함
+        max_ct = rng.choice([None, 0, -1, 7, 13, 20, 49, rng.randint(1, 60)])
+        if max_ct is not None:
+            item['max_cartons_per_pallet'] = max_ct
+        items.append(item)
+    return items
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_reference_on_random_orders(seed):
+    rng = random.Random(seed)
+    palletizer = Palletizer()
+    for _ in range(150):
+        order = _random_order(rng)
+        expected = _reference_pallets(order, palletizer.PALLET_BASE_WEIGHT, palletizer.PALLET_BASE_HEIGHT)
+        assert palletizer.calculate_pallets(order) == expected
+
+
+def test_full_pallet_at_float_boundary():
+    # 49 * (1/49) < 1.0 이므로 정확히 Max CT 만큼의 주문은 Mixed Pallet 하나가 됨
+    palletizer = Palletizer()
+    order = [{'sku': 'A', 'po_qty': 49, 'pack_size': 2, 'max_cartons_per_pallet': 49}]
+    pallets = palletizer.calculate_pallets(order)
+    expected = _reference_pallets(order, palletizer.PALLET_BASE_WEIGHT, palletizer.PALLET_BASE_HEIGHT)
+    assert pallets == expected
+    assert [p['type'] for p in pallets] == ['MIXED']
@@ -0,0 +1,58 @@
+"""
+TTLCache: entries expire ttl seconds after insertion and the least recently used
+entry is evicted once maxsize is exceeded.
+"""
+from services import utils
+from services.utils import TTLCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entry_expires_after_ttl(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(utils.time, "monotonic", clock)
+    cache = TTLCache(maxsize=10, ttl=30)
+    cache["a"] = 1
+    clock.now += 29.9
+    assert cache.get("a") == 1
+    clock.now += 0.2
+    assert cache.get("a") is None
+    assert cache.get("a", "missing") == "missing"
+    assert len(cache) == 0
+
+
+def test_reinsert_resets_ttl(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(utils.time, "monotonic", clock)
+    cache = TTLCache(maxsize=10, ttl=30)
+    cache["a"] = 1
+    clock.now += 20
+    cache["a"] = 2
+    clock.now += 20
+    assert cache.get("a") == 2
+
+
+def test_lru_eviction_respects_recent_gets():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache.get("a") == 1  # a 가 최근 사용 → b 가 먼저 밀려남
+    cache["c"] = 3
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_falsy_values_are_cached():
+    cache = TTLCache(maxsize=4, ttl=60)
+    cache["zero"] = 0
+    cache["empty"] = ()
+    assert cache.get("zero", "missing") == 0
+    assert cache.get("empty", "missing") == ()